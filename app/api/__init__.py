@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api import feed
+from app.api import feed, metrics, stats
 
 api_router = APIRouter()
 api_router.include_router(feed.router, tags=["feed"])
+api_router.include_router(stats.router, tags=["stats"])
+api_router.include_router(metrics.router, tags=["metrics"])
 
 __all__ = ["api_router"]
-
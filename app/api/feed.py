@@ -1,14 +1,18 @@
 from fastapi import APIRouter, HTTPException, Query, Request, Response, Depends
 from email.utils import parsedate_to_datetime
-from typing import Literal
+import time
+from typing import Dict, List, Literal, Optional, Tuple
 
+from app.core import metrics
 from app.core.config import get_settings
 from app.core.logger import logger
-from app.core.db import get_meta, get_mature_entries, compute_hash
-from app.services.fetcher import sync_with_upstream
+from app.core.db import MetaState, get_meta, get_meta_state, get_mature_entries, get_mature_validators, get_next_maturity, compute_hash
+from app.services.breaker import host_breaker
+from app.services.fetcher import sync_feed, revalidate
 from app.formats import FeedFormat
-from app.formats.handler import rebuild
-from app.utils.time import get_cutoff_time, get_latest_iso_time, iso_to_http_date
+from app.services.renderer import render
+from app.utils.compression import negotiate_encoding
+from app.utils.time import get_cutoff_time, get_future_time, get_latest_iso_time, iso_to_http_date, seconds_since
 
 router = APIRouter()
 settings = get_settings()
@@ -34,7 +38,8 @@ async def get_delayed_feed(
     url: str = Query(..., description="The upstream RSS feed URL"),
     delay: int = Query(1, ge=0, description="Delay duration"),
     unit: Literal["minute", "hour", "day"] = Query("hour", description="Time unit for delay"),
-    limit: int = Query(20, ge=1, le=200, description="Maximum number of entries to return")
+    limit: int = Query(20, ge=1, le=200, description="Maximum number of entries to return"),
+    ttl: Optional[int] = Query(None, ge=0, description="Freshness window in seconds before upstream is checked again")
 ):
     """
     Get a delayed RSS feed.
@@ -43,87 +48,205 @@ async def get_delayed_feed(
     - **delay**: Delay duration (default: 1, must be >= 0)
     - **unit**: Time unit - minute, hour, or day (default: hour)
     - **limit**: Maximum number of entries to return (default: 20, max: 200)
+    - **ttl**: Freshness window in seconds (default: `FRESHNESS_TTL` setting, 0 always checks upstream)
+    
+    Past the freshness window, stored data is served at once and upstream is
+    checked in the background for `STALE_WHILE_REVALIDATE` more seconds, and
+    for `STALE_IF_ERROR` seconds after upstream starts failing. Upstream is
+    not contacted at all while the feed backs off after a failed sync or
+    while the circuit breaker of its host is open.
     
     Returns the feed with only "mature" entries (published_at <= now - delay).
     """
+    started = time.perf_counter()
     delay_seconds = delay * DELAY_UNITS[unit]
+    freshness_ttl = settings.freshness_ttl if ttl is None else ttl
     
-    meta = await get_meta(url)
+    state = await get_meta_state(url)
     
-    try:
-        status_code = await sync_with_upstream(
-            url,
-            etag=meta.etag if meta else None,
-            last_modified=meta.last_modified if meta else None
-        )
-        
-        if status_code >= 200 and status_code < 300:
-            meta = await get_meta(url)
+    checked_ago = seconds_since(state.last_checked_at) if state else None
+    failing_for = seconds_since(state.failing_since) if state else None
+    retry_in = -seconds_since(state.retry_after) if state and state.retry_after else None
+    if state and settings.scheduler_enabled:
+        logger.debug(f"Feed {url} is refreshed by the scheduler, skipping upstream sync")
+    elif checked_ago is not None and checked_ago < freshness_ttl:
+        logger.debug(f"Feed {url} checked {checked_ago:.0f}s ago, skipping upstream sync")
+    elif retry_in is not None and retry_in > 0:
+        logger.debug(f"Feed {url} failing, not retrying upstream for {retry_in:.0f}s")
+    elif host_breaker.is_open(url):
+        logger.debug(f"Circuit open for the host of {url}, skipping upstream sync")
+    elif failing_for is not None and failing_for < settings.stale_if_error:
+        logger.debug(f"Feed {url} failing for {failing_for:.0f}s, serving stored data while it is retried")
+        revalidate(url, etag=state.etag, last_modified=state.last_modified)
+    elif checked_ago is not None and checked_ago < freshness_ttl + settings.stale_while_revalidate:
+        logger.debug(f"Feed {url} checked {checked_ago:.0f}s ago, serving stored data while it is refreshed")
+        revalidate(url, etag=state.etag, last_modified=state.last_modified)
+    else:
+        try:
+            status_code = await sync_feed(
+                url,
+                etag=state.etag if state else None,
+                last_modified=state.last_modified if state else None
+            )
             
-    except Exception as e:
-        logger.error(f"Failed to sync feed {url}: {e}", exc_info=True)
+            if status_code >= 200 and status_code < 300:
+                state = await get_meta_state(url)
+                
+        except Exception as e:
+            logger.error(f"Failed to sync feed {url}: {e}", exc_info=True)
     
-    if not meta:
+    if not state:
+        record_response(url, 502, started)
         raise HTTPException(status_code=502, detail="No feed data available")
     
     cutoff = get_cutoff_time(delay_seconds)
     logger.debug(f"Fetching mature entries for {url} with cutoff {cutoff}")
-
-    entries = await get_mature_entries(url, cutoff, limit=limit)
-    logger.debug(f"Returning {len(entries)} entries from {url}")
     
-    self_url = str(request.url)
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
     
-    # Compute ETag
-    content_etag = compute_hash(
-        '|'.join([e.hash for e in (meta, *entries)])
+    # Validate the client's copy from hashes alone; payloads are only loaded to render
+    validators = await get_mature_validators(url, cutoff, limit=limit)
+    content_etag, last_modified_http = compute_validators(
+        state.hash, state.updated_at, state.created_at, validators
     )
-    
-    # Compute Last-Modified from meta and entries, convert to HTTP-date format
-    entry_times = [e.discovered_at for e in entries if e.discovered_at] if entries else []
-    last_modified_iso = get_latest_iso_time(meta.updated_at, meta.created_at, *entry_times)
-    last_modified_http = iso_to_http_date(last_modified_iso)
+    max_age = compute_max_age(state, await get_next_maturity(url, cutoff), delay_seconds, freshness_ttl)
+    headers = response_headers(content_etag, last_modified_http, encoding, max_age)
     
     # Check client cache (ETag)
     client_etag = request.headers.get('If-None-Match')
     logger.debug(f"Client ETag: {client_etag}, Content ETag: {content_etag}")
-    if client_etag and client_etag.strip('"') == content_etag:
-        return Response(
-            status_code=304,
-            headers={
-                'ETag': f'"{content_etag}"',
-                'Last-Modified': last_modified_http or ''
-            }
-        )
+    if client_etag and etag_matches(client_etag, content_etag):
+        record_response(url, 304, started)
+        return Response(status_code=304, headers=headers)
     
     # Check client cache (Last-Modified)
     client_last_modified = request.headers.get('If-Modified-Since')
     logger.debug(f"Client Last-Modified: {client_last_modified}, Server Last-Modified: {last_modified_http}")
-    if client_last_modified and last_modified_http:
+    if not client_etag and client_last_modified and last_modified_http:
         try:
             client_dt = parsedate_to_datetime(client_last_modified)
             server_dt = parsedate_to_datetime(last_modified_http)
             if client_dt >= server_dt:
-                return Response(
-                    status_code=304,
-                    headers={
-                        'ETag': f'"{content_etag}"',
-                        'Last-Modified': last_modified_http or ''
-                    }
-                )
+                record_response(url, 304, started)
+                return Response(status_code=304, headers=headers)
         except (ValueError, TypeError):
             pass
     
-    # Rebuild feed
+    meta = await get_meta(url)
+    entries = await get_mature_entries(url, cutoff, limit=limit)
+    logger.debug(f"Returning {len(entries)} entries from {url}")
+    
+    # A sync may have landed since the validators were read; describe what is actually served
+    content_etag, last_modified_http = compute_validators(
+        meta.hash, meta.updated_at, meta.created_at,
+        [(e.hash, e.discovered_at) for e in entries]
+    )
+    headers = response_headers(content_etag, last_modified_http, encoding, max_age)
+    
+    # Rebuild feed, or reuse the render shared by identical requests
+    self_url = str(request.url)
     format = FeedFormat(meta.format)
-    output = rebuild(meta, entries, format, self_url, cutoff)
+    output = render(meta, entries, format, self_url, cutoff, content_etag, encoding)
+    if encoding:
+        headers['Content-Encoding'] = encoding
     
+    metrics.response_bytes.observe(len(output), format.value, encoding or "identity")
+    record_response(url, 200, started)
     return Response(
         content=output,
         media_type=format.content_type,
-        headers={
-            'ETag': f'"{content_etag}"',
-            'Last-Modified': last_modified_http or ''
-        }
+        headers=headers
     )
 
+def record_response(url: str, status: int, started: float) -> None:
+    metrics.feed_requests.inc(metrics.feed_label(url), status)
+    metrics.feed_seconds.observe(time.perf_counter() - started, status)
+
+def compute_validators(
+    meta_hash: str,
+    updated_at: Optional[str],
+    created_at: Optional[str],
+    entries: List[Tuple[str, Optional[str]]]
+) -> Tuple[str, Optional[str]]:
+    """
+    Compute the ETag and Last-Modified of a delayed feed.
+    
+    Takes the meta hash and times and the (hash, discovered_at) pairs of the
+    served entries; returns the content ETag and the HTTP-date Last-Modified.
+    """
+    content_etag = compute_hash('|'.join([meta_hash, *(h for h, _ in entries)]))
+    entry_times = [discovered_at for _, discovered_at in entries if discovered_at]
+    last_modified_iso = get_latest_iso_time(updated_at, created_at, *entry_times)
+    return content_etag, iso_to_http_date(last_modified_iso)
+
+def compute_max_age(
+    state: MetaState,
+    next_maturity: Optional[str],
+    delay_seconds: int,
+    freshness_ttl: int
+) -> int:
+    """
+    Seconds until the output of a delayed feed can next differ.
+    
+    That is the earlier of the next stored entry crossing the cutoff and the
+    next upstream sync, capped by the `CACHE_MAX_AGE` setting. A feed backing
+    off after a failed sync is not synced before its retry time.
+    """
+    max_age = float(settings.cache_max_age)
+    
+    if next_maturity:
+        matures_in = delay_seconds - (seconds_since(next_maturity) or 0.0)
+        max_age = min(max_age, matures_in)
+    
+    if settings.scheduler_enabled and state.next_check_at:
+        max_age = min(max_age, -(seconds_since(state.next_check_at) or 0.0))
+    else:
+        interval = settings.scheduler_interval if settings.scheduler_enabled else freshness_ttl
+        checked_ago = seconds_since(state.last_checked_at)
+        next_sync = interval - checked_ago if checked_ago is not None else 0.0
+        if state.retry_after:
+            next_sync = max(next_sync, -(seconds_since(state.retry_after) or 0.0))
+        max_age = min(max_age, next_sync)
+    
+    return max(0, int(max_age))
+
+def response_headers(
+    content_etag: str,
+    last_modified_http: Optional[str],
+    encoding: Optional[str],
+    max_age: int
+) -> Dict[str, str]:
+    """Validator and freshness headers shared by 200 and 304 responses"""
+    cache_control = f'public, max-age={max_age}'
+    if settings.stale_while_revalidate > 0:
+        cache_control += f', stale-while-revalidate={settings.stale_while_revalidate}'
+    if settings.stale_if_error > 0:
+        cache_control += f', stale-if-error={settings.stale_if_error}'
+    
+    return {
+        'ETag': representation_etag(content_etag, encoding),
+        'Last-Modified': last_modified_http or '',
+        'Cache-Control': cache_control,
+        'Expires': iso_to_http_date(get_future_time(max_age)),
+        'Vary': 'Accept-Encoding'
+    }
+
+def representation_etag(content_etag: str, encoding: Optional[str]) -> str:
+    """Strong ETag of one encoding of the content; each content coding gets its own"""
+    return f'"{content_etag}-{encoding}"' if encoding else f'"{content_etag}"'
+
+def etag_matches(if_none_match: str, content_etag: str) -> bool:
+    """
+    Check an If-None-Match header against the content, whatever its encoding.
+    
+    A client that cached one encoding of the content still holds the current
+    content, so the coding suffix of the listed tags is ignored.
+    """
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        tag = tag.removeprefix('W/').strip('"')
+        if tag.split('-', 1)[0] == content_etag:
+            return True
+    return False
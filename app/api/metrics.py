@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import registry
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """Per-stage latency and size metrics in the Prometheus text exposition format"""
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
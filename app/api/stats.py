@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from app.core.db import db_stats
+
+from app.services.breaker import host_breaker
+from app.services.fetcher import sync_stats
+from app.services.extractor import extraction_pool
+from app.services.http import http_client
+from app.services.renderer import render_cache
+from app.services.retention import retention
+from app.services.scheduler import scheduler
+
+router = APIRouter()
+
+@router.get("/stats")
+async def get_stats():
+    """Runtime counters of the feed pipeline"""
+    return {
+        "db": db_stats(),
+        "sync": sync_stats(),
+        "scheduler": scheduler.stats(),
+        "http": http_client.stats(),
+        "hosts": host_breaker.stats(),
+        "extract": extraction_pool.stats(),
+        "render_cache": render_cache.stats(),
+        "retention": retention.stats()
+    }
@@ -4,10 +4,17 @@ from app.core.config import get_settings
 from app.core.logger import logger
 from app.core.db import (
     init_db,
+    connect_db,
+    close_db,
     get_meta,
+    get_meta_state,
     get_mature_entries,
+    get_mature_validators,
     upsert_meta,
+    touch_meta,
+    record_sync_failure,
     upsert_entry,
+    upsert_entries,
     compute_hash,
     now_iso
 )
@@ -16,10 +23,17 @@ __all__ = [
     'get_settings',
     'logger',
     'init_db',
+    'connect_db',
+    'close_db',
     'get_meta',
+    'get_meta_state',
     'get_mature_entries',
+    'get_mature_validators',
     'upsert_meta',
+    'touch_meta',
+    'record_sync_failure',
     'upsert_entry',
+    'upsert_entries',
     'compute_hash',
     'now_iso',
 ]
@@ -1,11 +1,55 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 class Settings(BaseSettings):
     log_level: str = "INFO"
     database: str = "ltff.db"
+    db_readers: int = 4
+    db_journal_mode: str = "wal"
+    db_synchronous: str = "normal"
+    db_mmap_size: int = 268435456
+    db_cache_size: int = -16000
+    db_busy_timeout: int = 5000
+    db_write_batch_size: int = 256
+    db_write_max_latency: float = 0.0
     http_timeout: float = 60.0
+    http_read_timeout: float = 15.0
+    http_max_body_bytes: int = 10485760
+    http_max_connections: int = 20
+    http_max_host_connections: int = 6
+    http2: bool = True
+    upstream_host_concurrency: int = 4
+    breaker_failures: int = 5
+    breaker_open_seconds: int = 60
+    failure_backoff_base: int = 60
+    failure_backoff_max: int = 3600
+    fetch_lease_ttl: int = 120
+    freshness_ttl: int = 600
+    stale_while_revalidate: int = 0
+    stale_if_error: int = 0
+    cache_max_age: int = 3600
+    scheduler_enabled: bool = False
+    scheduler_interval: int = 900
+    scheduler_concurrency: int = 4
+    scheduler_jitter: float = 0.1
+    poll_min_interval: int = 300
+    poll_max_interval: int = 86400
+    poll_backoff_factor: float = 1.5
+    render_cache_max_bytes: int = 67108864
+    render_cache_bucket: int = 60
+    extract_executor: str = "process"
+    extract_workers: int = 2
+    extract_inline_max_bytes: int = 262144
+    extract_stream_min_bytes: int = 1048576
+    storage_codec: Literal["none", "zlib"] = "none"
     cleanup_after_days: int = 60
+    cleanup_max_entries: int = 1000
+    cleanup_keep_entries: int = 200
+    cleanup_max_delay_days: int = 30
+    cleanup_interval: int = 3600
+    cleanup_batch_size: int = 500
+    metrics_max_feeds: int = 50
     
     class Config:
         env_file = ".env"
@@ -1,17 +1,273 @@
+import asyncio
 import aiosqlite
 import hashlib
+import sqlite3
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional, Tuple
 from app.core.logger import logger
+from app.core.metrics import db_seconds
 from app.schemas import Meta, Entry
+from app.utils.codec import encode, decode
+from app.utils.time import get_future_time
 
 from app.core.config import get_settings
 
 settings = get_settings()
 
+# Persistent connections opened by connect_db(): one writer, a queue of readers
+_writer: Optional[aiosqlite.Connection] = None
+_write_lock = asyncio.Lock()
+_readers: Optional[asyncio.Queue] = None
+
+# Mutations waiting for the writer task, as (operation, future) pairs; None stops the task
+_write_queue: Optional[asyncio.Queue] = None
+_write_task: Optional[asyncio.Task] = None
+_write_batches = 0
+_write_ops = 0
+
+# Seconds init_db waits for another process to finish migrating the same database
+_MIGRATION_LOCK_TIMEOUT = 300.0
+# Hashes looked up per query, below SQLite's default limit of 999 bound parameters
+_HASH_CHUNK = 500
+
+# Codec new serialized payloads are stored with; rows record their own codec
+_storage_codec: Optional[str] = None if settings.storage_codec == "none" else settings.storage_codec
+
+async def _connect() -> aiosqlite.Connection:
+    db = await aiosqlite.connect(settings.database)
+    db.row_factory = aiosqlite.Row
+    for pragma in (
+        f"journal_mode = {settings.db_journal_mode}",
+        f"synchronous = {settings.db_synchronous}",
+        f"mmap_size = {settings.db_mmap_size}",
+        f"cache_size = {settings.db_cache_size}",
+        f"busy_timeout = {settings.db_busy_timeout}",
+    ):
+        # Close each cursor: a pending pragma result would block VACUUM on this connection
+        async with db.execute(f"PRAGMA {pragma}"):
+            pass
+    return db
+
+async def connect_db() -> None:
+    """Open the persistent writer and reader connections and start the writer task"""
+    global _writer, _readers, _write_queue, _write_task
+    if _writer is not None:
+        return
+    _writer = await _connect()
+    _readers = asyncio.Queue()
+    for _ in range(max(settings.db_readers, 1)):
+        _readers.put_nowait(await _connect())
+    _write_queue = asyncio.Queue()
+    _write_task = asyncio.create_task(_write_loop())
+    logger.info(f"Database connections opened (1 writer, {_readers.qsize()} readers)")
+
+async def close_db() -> None:
+    global _writer, _readers, _write_queue, _write_task
+    if _writer is None:
+        return
+    # Let the writer task commit what is already queued
+    _write_queue.put_nowait(None)
+    await _write_task
+    _write_queue, _write_task = None, None
+    await _writer.close()
+    while not _readers.empty():
+        await _readers.get_nowait().close()
+    _writer, _readers = None, None
+    logger.info("Database connections closed")
+
+@asynccontextmanager
+async def _reading() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a reader connection, or open a temporary one outside the app lifespan"""
+    if _readers is None:
+        db = await _connect()
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+    
+    db = await _readers.get()
+    try:
+        yield db
+    finally:
+        _readers.put_nowait(db)
+
+@asynccontextmanager
+async def _writing() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Hold the writer connection exclusively, or open a temporary one outside the app lifespan.
+    
+    For maintenance that manages its own transactions; other mutations go through _write().
+    """
+    if _writer is None:
+        db = await _connect()
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+    
+    async with _write_lock:
+        try:
+            yield _writer
+        except BaseException:
+            await _writer.rollback()
+            raise
+
+async def _write(op: Callable[[aiosqlite.Connection], Awaitable[Any]]) -> Any:
+    """
+    Run a mutation in the writer task's next transaction and return its result once committed.
+    
+    The operation must not commit or roll back itself. Outside the app
+    lifespan it runs in its own transaction on a temporary connection.
+    """
+    if _write_queue is None:
+        async with _writing() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            result = await op(db)
+            await db.commit()
+            return result
+    
+    if _write_task.done():
+        raise RuntimeError("Database writer task is not running")
+    future = asyncio.get_running_loop().create_future()
+    _write_queue.put_nowait((op, future))
+    return await future
+
+async def _write_loop() -> None:
+    """
+    Commit queued mutations in batches, one transaction per batch.
+    
+    A batch is whatever was queued while the previous one was committing,
+    after waiting up to `db_write_max_latency` for more, and at most
+    `db_write_batch_size` operations. Each operation runs in its own savepoint,
+    so a failing one is rolled back alone and only its caller gets the error.
+    A batch that fails as a whole fails its callers and the loop goes on.
+    """
+    stopping = False
+    while not stopping:
+        item = await _write_queue.get()
+        if item is None:
+            break
+        if settings.db_write_max_latency > 0:
+            await asyncio.sleep(settings.db_write_max_latency)
+        
+        batch = [item]
+        while len(batch) < settings.db_write_batch_size and not _write_queue.empty():
+            item = _write_queue.get_nowait()
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        
+        async with _write_lock:
+            started = time.perf_counter()
+            try:
+                await _commit_batch(batch)
+            except Exception as e:
+                logger.error(f"Write batch of {len(batch)} operations failed: {e}", exc_info=True)
+                _settle(batch, [(False, e)] * len(batch))
+            db_seconds.observe(time.perf_counter() - started, "write_batch")
+
+async def _commit_batch(batch: List[Tuple[Callable, asyncio.Future]]) -> None:
+    global _write_batches, _write_ops
+    outcomes = []
+    try:
+        if _writer.in_transaction:
+            # Left open by an earlier batch whose rollback failed
+            await _writer.rollback()
+        await _writer.execute("BEGIN IMMEDIATE")
+        if len(batch) == 1:
+            # Nothing to isolate: a failure rolls back the whole transaction below
+            outcomes.append((True, await batch[0][0](_writer)))
+        else:
+            for op, _ in batch:
+                await _writer.execute("SAVEPOINT write_op")
+                try:
+                    outcomes.append((True, await op(_writer)))
+                except Exception as e:
+                    await _writer.execute("ROLLBACK TO write_op")
+                    outcomes.append((False, e))
+                await _writer.execute("RELEASE write_op")
+        await _writer.commit()
+    except Exception as e:
+        logger.error(f"Write batch of {len(batch)} operations failed: {e}", exc_info=True)
+        outcomes = [(False, e)] * len(batch)
+        await _writer.rollback()
+    
+    _write_batches += 1
+    _write_ops += len(batch)
+    _settle(batch, outcomes)
+
+def _settle(batch: List[Tuple[Callable, asyncio.Future]], outcomes: List[Tuple[bool, Any]]) -> None:
+    """Hand each caller of the batch its result or error"""
+    for (_, future), (ok, value) in zip(batch, outcomes):
+        if future.done():
+            continue
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+def db_stats() -> dict:
+    """Counters of the batching writer task"""
+    return {
+        "write_batches": _write_batches,
+        "writes": _write_ops,
+        "write_queue": _write_queue.qsize() if _write_queue is not None else 0,
+    }
+
 async def init_db():
-    async with aiosqlite.connect(settings.database) as db:
-        await db.execute("""
+    """
+    Create the schema and apply pending migrations.
+    
+    Worker processes starting together on the same database take turns: the
+    schema is created and migrated in one BEGIN IMMEDIATE transaction, so each
+    process reads user_version only after the previous one committed.
+    """
+    async with aiosqlite.connect(settings.database, timeout=_MIGRATION_LOCK_TIMEOUT) as db:
+        await _lock_for_migration(db)
+        try:
+            await _create_schema(db)
+            await _migrate(db)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        
+        await _check_query_plans(db)
+        async with db.execute("PRAGMA auto_vacuum") as cursor:
+            (mode,) = await cursor.fetchone()
+        if mode != 2:
+            logger.warning(
+                "Incremental vacuum is off, so cleanup does not shrink the database file; "
+                "switch it with python -m app.tools.vacuum while the service is stopped"
+            )
+        logger.info("Database initialized successfully.")
+
+async def _lock_for_migration(db: aiosqlite.Connection) -> None:
+    """Set the database-wide pragmas, then start the migration transaction"""
+    deadline = time.monotonic() + _MIGRATION_LOCK_TIMEOUT
+    while True:
+        try:
+            # auto_vacuum only takes effect on a new database; existing ones are switched by
+            # app.tools.vacuum. Each cursor is closed: a pending pragma result keeps a shared
+            # lock that would block the commit of another process's migration
+            for pragma in ("auto_vacuum = INCREMENTAL", f"journal_mode = {settings.db_journal_mode}"):
+                async with db.execute(f"PRAGMA {pragma}"):
+                    pass
+            await db.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            # SQLite skips the busy timeout while another process switches the journal mode
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+async def _create_schema(db: aiosqlite.Connection) -> None:
+    await db.execute("""
         CREATE TABLE IF NOT EXISTS meta (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             feed TEXT NOT NULL UNIQUE,
@@ -24,42 +280,152 @@ async def init_db():
             updated_at TEXT NOT NULL,
             created_at TEXT NOT NULL
         );
-        """)
-        
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                feed TEXT NOT NULL,
-                format TEXT NOT NULL,
-                guid TEXT,
-                hash TEXT NOT NULL,
-                serialized TEXT NOT NULL,
-                published_at TEXT NOT NULL,
-                discovered_at TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            );
-        """)
-        
-        await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_meta_feed ON meta(feed);")
-        
-        await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_feed_hash ON entries(feed, hash);")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_entries_feed_published_discovered ON entries(feed, published_at DESC, discovered_at DESC);")
-        
-        await db.commit()
-        logger.info("Database initialized successfully.")
+    """)
+    
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feed TEXT NOT NULL,
+            format TEXT NOT NULL,
+            guid TEXT,
+            hash TEXT NOT NULL,
+            serialized TEXT NOT NULL,
+            published_at TEXT NOT NULL,
+            discovered_at TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+    """)
+    
+    await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_meta_feed ON meta(feed);")
+    
+    await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_feed_hash ON entries(feed, hash);")
+
+async def _ensure_column(db: aiosqlite.Connection, table: str, column: str, definition: str) -> None:
+    """Add a column to an existing table unless an earlier build already added it"""
+    async with db.execute(f"PRAGMA table_info({table})") as cursor:
+        columns = [row[1] for row in await cursor.fetchall()]
+    if column not in columns:
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+async def _migration_1(db: aiosqlite.Connection) -> None:
+    """Track upstream checks for freshness and background scheduling"""
+    await _ensure_column(db, "meta", "last_checked_at", "TEXT")
+    await _ensure_column(db, "meta", "next_check_at", "TEXT")
+    await _ensure_column(db, "meta", "unchanged_count", "INTEGER NOT NULL DEFAULT 0")
+
+async def _migration_2(db: aiosqlite.Connection) -> None:
+    """Serve mature entries in discovery order straight from an index"""
+    await db.execute("DROP INDEX IF EXISTS idx_entries_feed_published_discovered;")
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_feed_discovered_published
+        ON entries(feed, discovered_at DESC, published_at DESC, hash);
+    """)
+
+async def _migration_3(db: aiosqlite.Connection) -> None:
+    """Fingerprint upstream bodies and stored entries to skip unchanged syncs"""
+    await _ensure_column(db, "meta", "body_hash", "TEXT")
+    await _ensure_column(db, "meta", "body_fingerprint", "TEXT")
+    await _ensure_column(db, "entries", "fingerprint", "TEXT")
+
+async def _migration_4(db: aiosqlite.Connection) -> None:
+    """Let the retention job return freed pages to the filesystem"""
+    # Switching an existing database needs a blocking full VACUUM, so it is left
+    # to app.tools.vacuum; init_db warns while the database is not switched
+
+async def _migration_5(db: aiosqlite.Connection) -> None:
+    """Record the compression codec of each stored payload"""
+    await _ensure_column(db, "meta", "codec", "TEXT")
+    await _ensure_column(db, "entries", "codec", "TEXT")
+
+async def _migration_6(db: aiosqlite.Connection) -> None:
+    """Find the next entry to mature from an index"""
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_entries_feed_published ON entries(feed, published_at);")
+
+async def _migration_7(db: aiosqlite.Connection) -> None:
+    """Let one process at a time sync a feed with its upstream"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS fetch_leases (
+            feed TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        );
+    """)
+
+async def _migration_8(db: aiosqlite.Connection) -> None:
+    """Back off from feeds whose upstream syncs fail"""
+    await _ensure_column(db, "meta", "failure_count", "INTEGER NOT NULL DEFAULT 0")
+    await _ensure_column(db, "meta", "failing_since", "TEXT")
+    await _ensure_column(db, "meta", "retry_after", "TEXT")
+
+async def _migration_9(db: aiosqlite.Connection) -> None:
+    """Keep entries upstream still lists out of retention"""
+    await _ensure_column(db, "entries", "last_seen_at", "TEXT")
+
+async def _migration_10(db: aiosqlite.Connection) -> None:
+    """Count completed leased syncs so processes can tell when another one's sync finished"""
+    await _ensure_column(db, "meta", "sync_count", "INTEGER NOT NULL DEFAULT 0")
+
+# Applied in order on top of the base schema; PRAGMA user_version counts applied migrations
+_MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+    _migration_6,
+    _migration_7,
+    _migration_8,
+    _migration_9,
+    _migration_10,
+]
+
+async def _migrate(db: aiosqlite.Connection) -> None:
+    async with db.execute("PRAGMA user_version") as cursor:
+        (version,) = await cursor.fetchone()
+    
+    # Runs inside init_db's transaction: migrations must not commit
+    for number, migration in enumerate(_MIGRATIONS[version:], start=version + 1):
+        await migration(db)
+        await db.execute(f"PRAGMA user_version = {number}")
+        logger.info(f"Applied database migration {number}: {migration.__doc__}")
+
+async def _check_query_plans(db: aiosqlite.Connection) -> None:
+    """Warn if the per-request maturity queries have to sort instead of walking their index"""
+    async with db.execute(f"EXPLAIN QUERY PLAN {_MATURE_ENTRIES_SQL}", ("", "", 1)) as cursor:
+        plan = " | ".join(row[-1] for row in await cursor.fetchall())
+    if "TEMP B-TREE" in plan:
+        logger.warning(f"Mature entries query is not served by an index: {plan}")
+    else:
+        logger.debug(f"Mature entries query plan: {plan}")
+    
+    async with db.execute(f"EXPLAIN QUERY PLAN {_MATURE_VALIDATORS_SQL}", ("", "", 1)) as cursor:
+        plan = " | ".join(row[-1] for row in await cursor.fetchall())
+    if "COVERING INDEX" not in plan or "TEMP B-TREE" in plan:
+        logger.warning(f"Mature validators query does not use a covering index: {plan}")
+    else:
+        logger.debug(f"Mature validators query plan: {plan}")
 
 def compute_hash(content: str) -> str:
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
+def _decoded(row: aiosqlite.Row) -> dict:
+    """Row as a dict with its serialized payload decompressed"""
+    data = dict(row)
+    data['serialized'] = decode(data['serialized'], data.pop('codec', None), data['format'])
+    return data
+
 def now_iso() -> str:
     """Return current UTC time in ISO8601 with 'Z' suffix, no microseconds"""
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
 
+@db_seconds.time("upsert_meta")
 async def upsert_meta(meta: Meta) -> None:
     hash_value = compute_hash(meta.serialized)
+    serialized, codec = encode(meta.serialized, _storage_codec, meta.format)
     now = now_iso()
     
-    async with aiosqlite.connect(settings.database) as db:
+    # Writes run in BEGIN IMMEDIATE transactions, so another process can't insert the feed in between
+    async def op(db: aiosqlite.Connection) -> None:
         async with db.execute("SELECT hash, updated_at FROM meta WHERE feed = ?", (meta.feed,)) as cursor:
             existing = await cursor.fetchone()
         
@@ -69,65 +435,470 @@ async def upsert_meta(meta: Meta) -> None:
                 await db.execute("""
                     UPDATE meta SET
                         format = ?, hash = ?, etag = ?, last_modified = ?,
-                        updated = ?, serialized = ?, updated_at = ?
+                        updated = ?, serialized = ?, codec = ?, updated_at = ?, last_checked_at = ?,
+                        unchanged_count = 0, body_hash = ?, body_fingerprint = ?,
+                        failure_count = 0, failing_since = NULL, retry_after = NULL
                     WHERE feed = ?
                 """, (meta.format, hash_value, meta.etag, meta.last_modified,
-                      meta.updated, meta.serialized, now, meta.feed))
+                      meta.updated, serialized, codec, now, now,
+                      meta.body_hash, meta.body_fingerprint, meta.feed))
             else:
                 await db.execute("""
-                    UPDATE meta SET etag = ?, last_modified = ?
+                    UPDATE meta SET etag = ?, last_modified = ?, last_checked_at = ?,
+                        unchanged_count = 0, body_hash = ?, body_fingerprint = ?,
+                        failure_count = 0, failing_since = NULL, retry_after = NULL
                     WHERE feed = ?
-                """, (meta.etag, meta.last_modified, meta.feed))
+                """, (meta.etag, meta.last_modified, now,
+                      meta.body_hash, meta.body_fingerprint, meta.feed))
         else:
             await db.execute("""
-                INSERT INTO meta (feed, format, hash, etag, last_modified, updated, serialized, updated_at, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO meta (feed, format, hash, etag, last_modified, updated, serialized, codec, updated_at, created_at,
+                                  last_checked_at, body_hash, body_fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (meta.feed, meta.format, hash_value, meta.etag, meta.last_modified,
-                  meta.updated, meta.serialized, now, now))
+                  meta.updated, serialized, codec, now, now, now,
+                  meta.body_hash, meta.body_fingerprint))
+    
+    await _write(op)
+
+@db_seconds.time("touch_meta")
+async def touch_meta(feed: str) -> None:
+    """Record that upstream was checked without any change (e.g. 304 Not Modified)"""
+    now = now_iso()
+    await _write(lambda db: db.execute("""
+        UPDATE meta SET last_checked_at = ?, unchanged_count = unchanged_count + 1,
+            failure_count = 0, failing_since = NULL, retry_after = NULL
+        WHERE feed = ?
+    """, (now, feed)))
+
+@db_seconds.time("record_sync_failure")
+async def record_sync_failure(feed: str, backoff_base: float, backoff_max: float) -> Optional[str]:
+    """
+    Record a failed upstream sync and hold off retrying it.
+    
+    The feed is not synced again before retry_after, backoff_base seconds
+    from now doubled for every earlier consecutive failure, up to backoff_max.
+    
+    Returns:
+        The new retry_after, or None if the feed is unknown or backoff is disabled
+    """
+    now = now_iso()
+    
+    async def op(db: aiosqlite.Connection) -> Optional[str]:
+        async with db.execute("SELECT failure_count FROM meta WHERE feed = ?", (feed,)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
         
-        await db.commit()
+        backoff = min(backoff_base * 2 ** row[0], backoff_max)
+        retry_after = get_future_time(backoff) if backoff > 0 else None
+        await db.execute("""
+            UPDATE meta SET failure_count = failure_count + 1,
+                failing_since = COALESCE(failing_since, ?), retry_after = ?
+            WHERE feed = ?
+        """, (now, retry_after, feed))
+        return retry_after
+    
+    return await _write(op)
+
+@db_seconds.time("get_body_fingerprints")
+async def get_body_fingerprints(feed: str) -> Tuple[Optional[str], Optional[str]]:
+    """Get the (exact, normalized) fingerprints of the feed's last extracted upstream body"""
+    async with _reading() as db:
+        async with db.execute("SELECT body_hash, body_fingerprint FROM meta WHERE feed = ?", (feed,)) as cursor:
+            row = await cursor.fetchone()
+            return (row[0], row[1]) if row else (None, None)
 
+@db_seconds.time("set_body_fingerprints")
+async def set_body_fingerprints(feed: str, body_hash: str, body_fingerprint: str) -> None:
+    """Record the fingerprints of an upstream body whose header and entries are stored"""
+    await _write(lambda db: db.execute(
+        "UPDATE meta SET body_hash = ?, body_fingerprint = ? WHERE feed = ?",
+        (body_hash, body_fingerprint, feed)
+    ))
+
+@db_seconds.time("acquire_lease")
+async def acquire_lease(feed: str, owner: str, expires_at: str) -> bool:
+    """
+    Take the feed's fetch lease until expires_at, unless another owner holds an unexpired one.
+    
+    Returns:
+        True if the lease is now held by owner
+    """
+    async def op(db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute("""
+            INSERT INTO fetch_leases (feed, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(feed) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE fetch_leases.owner = excluded.owner OR fetch_leases.expires_at <= ?
+        """, (feed, owner, expires_at, now_iso()))
+        return cursor.rowcount > 0
+    
+    return await _write(op)
+
+@db_seconds.time("release_lease")
+async def release_lease(feed: str, owner: str, synced: bool) -> None:
+    """
+    Release the feed's fetch lease held by owner.
+    
+    A completed sync is counted in the same write, so processes waiting for
+    the lease see the new sync_count as soon as they see it released.
+    """
+    async def op(db: aiosqlite.Connection) -> None:
+        await db.execute("DELETE FROM fetch_leases WHERE feed = ? AND owner = ?", (feed, owner))
+        if synced:
+            await db.execute("UPDATE meta SET sync_count = sync_count + 1 WHERE feed = ?", (feed,))
+    
+    await _write(op)
+
+@db_seconds.time("lease_held")
+async def lease_held(feed: str) -> bool:
+    """Whether any owner holds an unexpired fetch lease on the feed"""
+    async with _reading() as db:
+        async with db.execute(
+            "SELECT 1 FROM fetch_leases WHERE feed = ? AND expires_at > ?",
+            (feed, now_iso())
+        ) as cursor:
+            return await cursor.fetchone() is not None
+
+@db_seconds.time("schedule_next_check")
+async def schedule_next_check(feed: str, next_check_at: str) -> None:
+    await _write(lambda db: db.execute(
+        "UPDATE meta SET next_check_at = ? WHERE feed = ?", (next_check_at, feed)
+    ))
+
+async def get_due_feeds(
+    now: str,
+    stale_before: str,
+    limit: int = 1000
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    List feeds whose next upstream check is due, as (feed, etag, last_modified).
+    
+    Feeds never scheduled are due once their last check is older than
+    stale_before; feeds backing off after failed syncs once retry_after is past.
+    """
+    async with _reading() as db:
+        async with db.execute("""
+            SELECT feed, etag, last_modified FROM meta
+            WHERE (next_check_at <= ?
+                   OR (next_check_at IS NULL AND (last_checked_at IS NULL OR last_checked_at <= ?)))
+              AND (retry_after IS NULL OR retry_after <= ?)
+            ORDER BY next_check_at
+            LIMIT ?
+        """, (now, stale_before, now, limit)) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+async def get_poll_history(feed: str, limit: int = 20) -> Tuple[int, List[Tuple[str, str]]]:
+    """
+    Get the data used to adapt a feed's polling cadence.
+    
+    Returns the number of consecutive unchanged upstream checks and the
+    (published_at, discovered_at) pairs of the most recently discovered entries.
+    """
+    async with _reading() as db:
+        async with db.execute("SELECT unchanged_count FROM meta WHERE feed = ?", (feed,)) as cursor:
+            row = await cursor.fetchone()
+        async with db.execute("""
+            SELECT published_at, discovered_at FROM entries
+            WHERE feed = ?
+            ORDER BY discovered_at DESC
+            LIMIT ?
+        """, (feed, limit)) as cursor:
+            history = [tuple(r) for r in await cursor.fetchall()]
+        return (row[0] if row else 0), history
+
+class MetaState(NamedTuple):
+    """The meta columns needed to validate a cached response, without the serialized header"""
+    hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    last_checked_at: Optional[str]
+    next_check_at: Optional[str]
+    updated_at: str
+    created_at: str
+    failure_count: int
+    failing_since: Optional[str]
+    retry_after: Optional[str]
+    sync_count: int
+
+@db_seconds.time("get_meta_state")
+async def get_meta_state(feed: str) -> Optional[MetaState]:
+    async with _reading() as db:
+        async with db.execute("""
+            SELECT hash, etag, last_modified, last_checked_at, next_check_at, updated_at, created_at,
+                   failure_count, failing_since, retry_after, sync_count
+            FROM meta WHERE feed = ?
+        """, (feed,)) as cursor:
+            row = await cursor.fetchone()
+            return MetaState(*row) if row else None
+
+@db_seconds.time("get_meta")
 async def get_meta(feed: str) -> Optional[Meta]:
-    async with aiosqlite.connect(settings.database) as db:
-        db.row_factory = aiosqlite.Row
+    async with _reading() as db:
         async with db.execute("SELECT * FROM meta WHERE feed = ?", (feed,)) as cursor:
             row = await cursor.fetchone()
-            return Meta(**dict(row)) if row else None
+            return Meta(**_decoded(row)) if row else None
+
+_UPSERT_ENTRY_SQL = """
+    INSERT INTO entries (feed, format, guid, hash, serialized, codec, fingerprint, published_at, discovered_at, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(feed, hash) DO UPDATE SET
+        serialized = excluded.serialized,
+        codec = excluded.codec,
+        fingerprint = excluded.fingerprint,
+        published_at = excluded.published_at
+    WHERE entries.fingerprint IS NOT excluded.fingerprint
+"""
+
+def compute_entry_fingerprint(entry: Entry) -> str:
+    return compute_hash(f"{entry.published_at}|{entry.serialized}")
+
+def _entry_params(feed: str, entry: Entry, now: str) -> tuple:
+    serialized, codec = encode(entry.serialized, _storage_codec, entry.format)
+    return (feed, entry.format, entry.guid, entry.hash, serialized, codec,
+            entry.fingerprint or compute_entry_fingerprint(entry),
+            entry.published_at, entry.discovered_at, now)
+
+async def _changed_entries(db: aiosqlite.Connection, feed: str, entries: List[Entry]) -> List[Entry]:
+    """Drop entries already stored with the same content and published time"""
+    # Only the synced entries' rows, looked up by hash, however many the feed has stored
+    hashes = list({entry.hash for entry in entries})
+    stored = {}
+    for start in range(0, len(hashes), _HASH_CHUNK):
+        chunk = hashes[start:start + _HASH_CHUNK]
+        async with db.execute(
+            f"SELECT hash, fingerprint FROM entries WHERE feed = ? AND hash IN ({', '.join('?' * len(chunk))})",
+            (feed, *chunk)
+        ) as cursor:
+            stored.update({row[0]: row[1] for row in await cursor.fetchall()})
+    
+    changed = []
+    for entry in entries:
+        entry.fingerprint = compute_entry_fingerprint(entry)
+        if stored.get(entry.hash) != entry.fingerprint:
+            changed.append(entry)
+    return changed
 
 async def upsert_entry(entry: Entry) -> None:
+    params = _entry_params(entry.feed, entry, now_iso())
+    await _write(lambda db: db.execute(_UPSERT_ENTRY_SQL, params))
+
+@db_seconds.time("upsert_entries")
+async def upsert_entries(feed: str, entries: List[Entry]) -> int:
+    """
+    Insert or update all entries of a feed in a single transaction.
+    
+    Entries whose serialized content and published time match the stored
+    fingerprint are skipped without being sent to SQLite. If the batch fails,
+    entries are retried one by one in the same write so a single bad entry
+    does not drop the rest.
+    
+    Every entry of the batch, stored or skipped, gets the same last_seen_at,
+    which tells the retention job which entries upstream still lists.
+    
+    Returns:
+        Number of new or changed entries stored
+    """
+    if not entries:
+        return 0
+    
     now = now_iso()
+    async def op(db: aiosqlite.Connection) -> int:
+        stored = await _store_entries(db, feed, await _changed_entries(db, feed, entries), now)
+        await db.executemany(
+            "UPDATE entries SET last_seen_at = ? WHERE feed = ? AND hash = ?",
+            [(now, feed, entry.hash) for entry in entries]
+        )
+        return stored
+    
+    return await _write(op)
+
+async def _store_entries(db: aiosqlite.Connection, feed: str, changed: List[Entry], now: str) -> int:
+    if not changed:
+        return 0
+    await db.execute("SAVEPOINT upsert_entries")
+    try:
+        await db.executemany(_UPSERT_ENTRY_SQL, [_entry_params(feed, e, now) for e in changed])
+        await db.execute("RELEASE upsert_entries")
+        return len(changed)
+    except Exception as e:
+        await db.execute("ROLLBACK TO upsert_entries")
+        await db.execute("RELEASE upsert_entries")
+        logger.warning(f"Batch upsert failed for {feed}, retrying entries one by one: {e}")
     
-    async with aiosqlite.connect(settings.database) as db:
+    stored = 0
+    for idx, entry in enumerate(changed):
+        try:
+            await db.execute(_UPSERT_ENTRY_SQL, _entry_params(feed, entry, now))
+            stored += 1
+        except Exception as e:
+            logger.error(f"Failed to process entry {idx} from {feed}: {e}", exc_info=True)
+    return stored
+
+# Walks idx_entries_feed_discovered_published in order, filtering on published_at from the index.
+# Entries discovered by the same sync are returned newest published first.
+# The unary + keeps idx_entries_feed_published from being chosen for the range and then sorted.
+_MATURE_ENTRIES_SQL = """
+    SELECT * FROM entries
+    WHERE feed = ? AND +published_at <= ?
+    ORDER BY discovered_at DESC, published_at DESC
+    LIMIT ?
+"""
+
+@db_seconds.time("get_mature_entries")
+async def get_mature_entries(feed: str, cutoff: str, limit: int = 200) -> List[Entry]:
+    async with _reading() as db:
+        async with db.execute(_MATURE_ENTRIES_SQL, (feed, cutoff, limit)) as cursor:
+            rows = await cursor.fetchall()
+            return [Entry(**_decoded(row)) for row in rows]
+
+# Same selection and order as _MATURE_ENTRIES_SQL, answered from the index alone
+_MATURE_VALIDATORS_SQL = """
+    SELECT hash, discovered_at FROM entries
+    WHERE feed = ? AND +published_at <= ?
+    ORDER BY discovered_at DESC, published_at DESC
+    LIMIT ?
+"""
+
+@db_seconds.time("get_mature_validators")
+async def get_mature_validators(feed: str, cutoff: str, limit: int = 200) -> List[Tuple[str, str]]:
+    """Get the (hash, discovered_at) pairs of the entries get_mature_entries() would return"""
+    async with _reading() as db:
+        async with db.execute(_MATURE_VALIDATORS_SQL, (feed, cutoff, limit)) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+@db_seconds.time("get_next_maturity")
+async def get_next_maturity(feed: str, cutoff: str) -> Optional[str]:
+    """Get the earliest published_at of the feed's entries that are not mature at the cutoff yet"""
+    async with _reading() as db:
         async with db.execute(
-            "SELECT serialized, published_at FROM entries WHERE feed = ? AND hash = ?", 
-            (entry.feed, entry.hash)
+            "SELECT MIN(published_at) FROM entries WHERE feed = ? AND published_at > ?",
+            (feed, cutoff)
         ) as cursor:
-            existing = await cursor.fetchone()
-        
-        if existing:
-            old_serialized, old_published_at = existing
-            if old_serialized != entry.serialized or old_published_at != entry.published_at:
-                await db.execute("""
-                    UPDATE entries SET serialized = ?, published_at = ?
-                    WHERE feed = ? AND hash = ?
-                """, (entry.serialized, entry.published_at, entry.feed, entry.hash))
-        else:
-            await db.execute("""
-                INSERT INTO entries (feed, format, guid, hash, serialized, published_at, discovered_at, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (entry.feed, entry.format, entry.guid, entry.hash,
-                  entry.serialized, entry.published_at, entry.discovered_at, now))
-        
-        await db.commit()
+            (published_at,) = await cursor.fetchone()
+            return published_at
 
-async def get_mature_entries(feed: str, cutoff: str, limit: int = 200) -> List[Entry]:
-    async with aiosqlite.connect(settings.database) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("""
-            SELECT * FROM entries
-            WHERE feed = ? AND published_at <= ?
-            ORDER BY discovered_at DESC
-            LIMIT ?
-        """, (feed, cutoff, limit)) as cursor:
+async def list_feeds() -> List[str]:
+    async with _reading() as db:
+        async with db.execute("SELECT feed FROM meta ORDER BY feed") as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+async def count_entries_since(feed: str, discovered_after: str, published_before: Optional[str] = None) -> int:
+    """Count the feed's entries discovered at or after the given time, and published by published_before if set"""
+    async with _reading() as db:
+        async with db.execute(
+            "SELECT COUNT(*) FROM entries WHERE feed = ? AND discovered_at >= ? AND (? IS NULL OR published_at <= ?)",
+            (feed, discovered_after, published_before, published_before)
+        ) as cursor:
+            (count,) = await cursor.fetchone()
+            return count
+
+async def delete_entries_after(feed: str, offset: int, batch_size: int, published_before: Optional[str] = None) -> int:
+    """
+    Delete up to batch_size entries of a feed that come after the first
+    `offset` entries in serving order (newest discovered first).
+    
+    With published_before set, only entries published by then are counted
+    and deleted: the newer ones are still maturing for some delay.
+    
+    Entries listed in the last extracted upstream body, those with the
+    feed's latest last_seen_at, are never deleted: they would be discovered
+    again by the next sync and served as new.
+    
+    Returns:
+        Number of entries deleted
+    """
+    async def op(db: aiosqlite.Connection) -> int:
+        async with db.execute("SELECT MAX(last_seen_at) FROM entries WHERE feed = ?", (feed,)) as cursor:
+            (last_seen,) = await cursor.fetchone()
+        cursor = await db.execute("""
+            DELETE FROM entries WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, last_seen_at FROM entries
+                    WHERE feed = ? AND (? IS NULL OR published_at <= ?)
+                    ORDER BY discovered_at DESC, published_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                WHERE ? IS NULL OR last_seen_at IS NOT ?
+                LIMIT ?
+            )
+        """, (feed, published_before, published_before, offset, last_seen, last_seen, batch_size))
+        return cursor.rowcount
+    
+    return await _write(op)
+
+async def incremental_vacuum(max_pages: int) -> int:
+    """
+    Return up to max_pages free pages to the filesystem.
+    
+    Returns:
+        Number of bytes reclaimed
+    """
+    async with _writing() as db:
+        async with db.execute("PRAGMA page_size") as cursor:
+            (page_size,) = await cursor.fetchone()
+        async with db.execute("PRAGMA freelist_count") as cursor:
+            (before,) = await cursor.fetchone()
+        if not before:
+            return 0
+        # executescript steps the pragma to completion; execute would free a single page
+        await db.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+        async with db.execute("PRAGMA freelist_count") as cursor:
+            (after,) = await cursor.fetchone()
+        return (before - after) * page_size
+
+async def checkpoint_db() -> None:
+    """Copy the WAL back into the database file and truncate it"""
+    async with _writing() as db:
+        await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+async def vacuum_db(incremental: bool = False) -> None:
+    """
+    Rebuild the whole database file compactly; blocks writers while it runs.
+    
+    With incremental, the database is also switched to auto_vacuum=INCREMENTAL,
+    which lets the retention job hand freed pages back to the filesystem.
+    """
+    async with _writing() as db:
+        if incremental:
+            await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        await db.execute("VACUUM")
+
+async def recompress_rows(table: str, codec: Optional[str], batch_size: int = 500) -> int:
+    """
+    Rewrite the stored payloads of a table with the given codec, in place.
+    
+    Rows are converted in batches of batch_size, each read and rewritten in
+    its own short write transaction, so the service can keep running
+    meanwhile without a concurrent write being overwritten.
+    
+    Returns:
+        Number of rows rewritten
+    """
+    if table not in ("meta", "entries"):
+        raise ValueError(f"Unsupported table: {table}")
+    
+    async def op(db: aiosqlite.Connection) -> Tuple[Optional[int], int]:
+        async with db.execute(f"""
+            SELECT id, format, serialized, codec FROM {table}
+            WHERE id > ? ORDER BY id LIMIT ?
+        """, (last_id, batch_size)) as cursor:
             rows = await cursor.fetchall()
-            return [Entry(**dict(row)) for row in rows]
+        if not rows:
+            return None, 0
+        
+        updates = []
+        for row_id, format, value, row_codec in rows:
+            stored, new_codec = encode(decode(value, row_codec, format), codec, format)
+            if new_codec != row_codec:
+                updates.append((stored, new_codec, row_id))
+        await db.executemany(f"UPDATE {table} SET serialized = ?, codec = ? WHERE id = ?", updates)
+        return rows[-1][0], len(updates)
+    
+    converted, last_id = 0, 0
+    while True:
+        last_id, batch = await _write(op)
+        if last_id is None:
+            return converted
+        converted += batch
+        await asyncio.sleep(0)
@@ -0,0 +1,43 @@
+from app.core.config import get_settings
+from app.utils.metrics import Counter, Gauge, Histogram, BoundedLabel, Registry, SIZE_BUCKETS
+
+settings = get_settings()
+
+registry = Registry()
+
+# Feed URL label value, limited to the first METRICS_MAX_FEEDS feeds seen
+feed_label = BoundedLabel(settings.metrics_max_feeds)
+
+feed_requests = registry.register(Counter(
+    "ltff_feed_responses_total", "Responses of /feed by feed and status code", ("feed", "status")
+))
+feed_seconds = registry.register(Histogram(
+    "ltff_feed_request_seconds", "Time spent answering /feed by status code", ("status",)
+))
+response_bytes = registry.register(Histogram(
+    "ltff_feed_response_bytes", "Body size of /feed responses by format and content coding",
+    ("format", "encoding"), SIZE_BUCKETS
+))
+upstream_responses = registry.register(Counter(
+    "ltff_upstream_responses_total", "Upstream fetches by feed and status code (error when no response)",
+    ("feed", "status")
+))
+circuit_open = registry.register(Gauge(
+    "ltff_upstream_circuit_open", "Upstream hosts whose circuit breaker is open (1), by host", ("host",)
+))
+upstream_seconds = registry.register(Histogram(
+    "ltff_upstream_fetch_seconds", "Upstream fetch time by status code", ("status",)
+))
+upstream_bytes = registry.register(Histogram(
+    "ltff_upstream_body_bytes", "Size of upstream bodies downloaded", (), SIZE_BUCKETS
+))
+extract_seconds = registry.register(Histogram(
+    "ltff_extract_seconds", "Feed extraction time by format and where it ran", ("format", "mode")
+))
+rebuild_seconds = registry.register(Histogram(
+    "ltff_rebuild_seconds", "Feed document rebuild time by format", ("format",)
+))
+db_seconds = registry.register(Histogram(
+    "ltff_db_seconds", "Database call time by operation, including waits for a connection or a write batch",
+    ("operation",)
+))
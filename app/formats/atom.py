@@ -3,40 +3,53 @@ from typing import List, Tuple, Optional
 from app.schemas import Meta, Entry
 from app.core.logger import logger
 from app.formats import FeedFormat
+from app.formats.xml import iter_split, read_fields, split_document, splice_entries
 from app.utils.feed import compute_feed_updated_time
 
 _FORMAT = FeedFormat.ATOM.value
 _NS = {'atom': 'http://www.w3.org/2005/Atom'}
+_FEED = f"{{{_NS['atom']}}}feed"
+_ENTRY = f"{{{_NS['atom']}}}entry"
 
-def extract(content: bytes, parsed) -> Tuple[Optional[Meta], List[Entry]]:
+def extract(root) -> Tuple[Optional[Meta], List[Entry], List[dict]]:
+    """Split a parsed document into its header and entries, with the fields read from each entry"""
     try:
-        root = etree.fromstring(content)
-
-        # Entry
         entry_elements = root.xpath('/atom:feed/atom:entry', namespaces=_NS)
-        entries = [
-            Entry(
-                format=_FORMAT,
-                serialized=etree.tostring(entry_elem, encoding='unicode', pretty_print=False)
-            )
-            for entry_elem in entry_elements
-        ]
-
-        # Meta
-        for entry_element in entry_elements:
-            entry_element.getparent().remove(entry_element)
+        fields = [read_fields(entry_elem) for entry_elem in entry_elements]
+        header, fragments = split_document(root, entry_elements)
+        meta = Meta(
+            format=_FORMAT,
+            serialized=header,
+            updated=compute_feed_updated_time(read_fields(root))
+        )
+        entries = [Entry(format=_FORMAT, serialized=fragment) for fragment in fragments]
+        
+        return meta, entries, fields
+    except Exception as e:
+        logger.error(f"Failed to extract Atom feed: {e}", exc_info=True)
+        return None, [], []
 
-        meta_serialized = etree.tostring(root, encoding='unicode', pretty_print=False)
+def extract_stream(content: bytes) -> Tuple[Optional[Meta], List[Entry], List[dict]]:
+    """Incremental variant of extract for large documents, dropping each entry once serialized"""
+    try:
+        root, fragments, fields = iter_split(content, _is_entry)
+        if root is None or root.tag != _FEED:
+            return None, [], []
         meta = Meta(
             format=_FORMAT,
-            serialized=meta_serialized,
-            updated=compute_feed_updated_time(parsed.feed)
+            serialized=etree.tostring(root, encoding='unicode', pretty_print=False),
+            updated=compute_feed_updated_time(read_fields(root))
         )
+        entries = [Entry(format=_FORMAT, serialized=fragment) for fragment in fragments]
         
-        return meta, entries
+        return meta, entries, fields
     except Exception as e:
         logger.error(f"Failed to extract Atom feed: {e}", exc_info=True)
-        return None, []
+        return None, [], []
+
+def _is_entry(elem) -> bool:
+    parent = elem.getparent()
+    return elem.tag == _ENTRY and parent is not None and parent.getparent() is None
 
 def rebuild(meta: Meta, entries: List[Entry], self_url: str, cutoff_time: str) -> str:
     try:
@@ -49,10 +62,6 @@ def rebuild(meta: Meta, entries: List[Entry], self_url: str, cutoff_time: str) -
         if updated_elems:
             updated_elems[0].text = cutoff_time
 
-        for entry_data in entries:
-            entry_elem = etree.fromstring(entry_data.serialized.encode('utf-8'))
-            root.append(entry_elem)
-        
-        return etree.tostring(root, encoding='utf-8', pretty_print=False, xml_declaration=True).decode('utf-8')
+        return splice_entries(root, root, entries)
     except Exception as e:
         raise ValueError(f"Failed to rebuild Atom feed: {e}")
@@ -1,9 +1,36 @@
+import json
 import feedparser
+from lxml import etree
 from typing import List, Tuple, Optional
 from app.schemas import Entry, Meta
+from app.core.config import get_settings
+from app.core.logger import logger
 from app.formats import FeedFormat
 from app.formats import rss2, atom, jsonfeed
-from app.utils.feed import compute_entry_hash, compute_entry_published_time, compute_entry_guid
+from app.formats.xml import root_tag
+from app.utils.feed import compute_entry_hash, compute_entry_published_time, compute_entry_guid, compute_feed_updated_time
+
+settings = get_settings()
+
+_XML_FORMATS = {
+    '{http://www.w3.org/2005/Atom}feed': FeedFormat.ATOM,
+    'rss': FeedFormat.RSS2
+}
+
+_EXTRACTORS = {
+    FeedFormat.ATOM: atom.extract,
+    FeedFormat.RSS2: rss2.extract,
+    FeedFormat.JSON_FEED: jsonfeed.extract
+}
+
+# Attribute whose URIs feedparser resolves entry ids and links against; read_fields does not
+_XML_BASE = b'xml:base'
+
+# Incremental extractors used for XML documents of at least EXTRACT_STREAM_MIN_BYTES
+_STREAM_EXTRACTORS = {
+    FeedFormat.ATOM: atom.extract_stream,
+    FeedFormat.RSS2: rss2.extract_stream
+}
 
 def extract(
     content: bytes, 
@@ -11,21 +38,28 @@ def extract(
     discovered_at: str,
     etag: str = None,
     last_modified: str = None
-) -> Tuple[Optional[Meta], List[Entry], object]:
-    parsed = feedparser.parse(content)
+) -> Tuple[Optional[Meta], List[Entry], Optional[str]]:
+    """
+    Split an upstream document into its header and entries.
     
-    if not parsed.feed:
-        return None, [], None
-    
-    format = FeedFormat.detect(parsed)
+    The document is parsed once with lxml (or json) and each entry's identity
+    and dates are read from the same tree its fragment is serialized from.
+    Large XML documents are parsed incrementally, dropping every entry from
+    the tree as soon as it is serialized.
     
-    handlers = {
-        FeedFormat.ATOM: atom.extract,
-        FeedFormat.RSS2: rss2.extract,
-        FeedFormat.JSON_FEED: jsonfeed.extract
-    }
+    feedparser is only run for what this pass cannot handle: malformed
+    XML, formats other than Atom 1.0, RSS 2.0 and JSON Feed, documents using
+    xml:base, against which feedparser resolves ids and links, and entries
+    without an id or link, whose hash depends on feedparser's normalization.
     
-    meta, entries = handlers[format](content, parsed)
+    Only plain, picklable data is returned so extraction can run in a worker
+    process: the header, the entries and the feedparser error message for
+    malformed (bozo) documents.
+    """
+    meta, entries, fields = _extract_single_pass(content)
+    warning = None
+    if meta is None:
+        meta, entries, fields, warning = _extract_with_feedparser(content)
     
     if not meta:
         return None, [], None
@@ -35,15 +69,67 @@ def extract(
     meta.last_modified = last_modified
     meta.updated = meta.updated or discovered_at
 
-    for idx, entry in enumerate(entries):
-        parsed_entry = parsed.entries[idx]
+    for entry, entry_fields in zip(entries, fields):
         entry.feed = url
-        entry.guid = compute_entry_guid(parsed_entry)
-        entry.hash = compute_entry_hash(parsed_entry)
-        entry.published_at = compute_entry_published_time(parsed_entry) or discovered_at
+        entry.guid = compute_entry_guid(entry_fields)
+        entry.hash = compute_entry_hash(entry_fields)
+        entry.published_at = compute_entry_published_time(entry_fields) or discovered_at
         entry.discovered_at = discovered_at
 
-    return meta, entries, parsed
+    return meta, entries, warning
+
+def _detect(content: bytes) -> Optional[FeedFormat]:
+    """Detect the format from the first byte and, for XML, the root tag alone"""
+    if content.lstrip(b'\xef\xbb\xbf \t\r\n')[:1] == b'{':
+        return FeedFormat.JSON_FEED
+    return _XML_FORMATS.get(root_tag(content))
+
+def _extract_single_pass(content: bytes) -> Tuple[Optional[Meta], List[Entry], List[dict]]:
+    try:
+        format = _detect(content)
+        if format is None or (format != FeedFormat.JSON_FEED and _XML_BASE in content):
+            return None, [], []
+        
+        if format == FeedFormat.JSON_FEED:
+            root = json.loads(content)
+            if not isinstance(root, dict) or 'jsonfeed.org' not in str(root.get('version', '')):
+                return None, [], []
+            return jsonfeed.extract(root)
+        
+        if len(content) >= settings.extract_stream_min_bytes:
+            meta, entries, fields = _STREAM_EXTRACTORS[format](content)
+        else:
+            meta, entries, fields = _EXTRACTORS[format](etree.fromstring(content))
+    except Exception:
+        return None, [], []
+    
+    if not all(f.get('id') or f.get('link') for f in fields):
+        return None, [], []
+    return meta, entries, fields
+
+def _extract_with_feedparser(content: bytes) -> Tuple[Optional[Meta], List[Entry], List[dict], Optional[str]]:
+    parsed = feedparser.parse(content)
+    
+    if not parsed.feed:
+        return None, [], [], None
+    
+    format = FeedFormat.detect(parsed)
+    try:
+        root = json.loads(content) if format == FeedFormat.JSON_FEED else etree.fromstring(content)
+    except Exception as e:
+        logger.error(f"Failed to parse {format.value} feed: {e}")
+        return None, [], [], None
+    
+    meta, entries, _ = _EXTRACTORS[format](root)
+    if not meta:
+        return None, [], [], None
+    if len(entries) != len(parsed.entries):
+        logger.error(f"Feedparser found {len(parsed.entries)} entries where lxml found {len(entries)}")
+        return None, [], [], None
+    
+    meta.updated = compute_feed_updated_time(parsed.feed)
+    warning = str(parsed.bozo_exception) if parsed.bozo else None
+    return meta, entries, parsed.entries, warning
 
 def rebuild(meta: Meta,
             entries: List[Entry],
@@ -3,22 +3,22 @@ from typing import List, Tuple, Optional
 from app.schemas import Meta, Entry
 from app.core.logger import logger
 from app.formats import FeedFormat
-from app.utils.feed import compute_feed_updated_time
+from app.utils.time import parse_date_string
 
 _FORMAT = FeedFormat.JSON_FEED.value
 
-def extract(content: bytes, parsed) -> Tuple[Optional[Meta], List[Entry]]:
+def extract(root: dict) -> Tuple[Optional[Meta], List[Entry], List[dict]]:
+    """Split a parsed document into its header and items, with the fields read from each item"""
     try:
-        root = json.loads(content)
         meta_data = {k: v for k, v in root.items() if k != 'items'}
         meta_serialized = json.dumps(meta_data, ensure_ascii=False, sort_keys=True)
         meta = Meta(
             format=_FORMAT,
             serialized=meta_serialized,
-            updated=compute_feed_updated_time(parsed.feed)
+            updated=None
         )
 
-        items = parsed.feed.get('items', [])
+        items = root.get('items') or []
         entries = [
             Entry(
                 format=_FORMAT,
@@ -26,11 +26,27 @@ def extract(content: bytes, parsed) -> Tuple[Optional[Meta], List[Entry]]:
             )
             for item in items
         ]
+        fields = [_read_fields(item) for item in items]
         
-        return meta, entries
+        return meta, entries, fields
     except Exception as e:
         logger.error(f"Failed to extract JSONFeed feed: {e}", exc_info=True)
-        return None, []
+        return None, [], []
+
+def _read_fields(item: dict) -> dict:
+    """Map a JSON Feed item to the field names feedparser uses for entries"""
+    fields = {k: v for k, v in item.items() if isinstance(v, (str, int, float))}
+    if item.get('id') is not None:
+        fields['id'] = str(item['id'])
+    if item.get('url'):
+        fields['link'] = item['url']
+    if item.get('date_published'):
+        fields['published'] = item['date_published']
+        fields['published_parsed'] = parse_date_string(item['date_published'])
+    if item.get('date_modified'):
+        fields['updated'] = item['date_modified']
+        fields['updated_parsed'] = parse_date_string(item['date_modified'])
+    return fields
 
 def rebuild(meta: Meta, entries: List[Entry], self_url: str, cutoff_time: str) -> str:
     meta_data = json.loads(meta.serialized)
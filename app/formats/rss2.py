@@ -3,6 +3,7 @@ from typing import List, Tuple, Optional
 from app.schemas import Meta, Entry
 from app.core.logger import logger
 from app.formats import FeedFormat
+from app.formats.xml import iter_split, read_fields, split_document, splice_entries
 from app.utils.feed import compute_feed_updated_time
 from app.utils.time import iso_to_http_date
 
@@ -10,38 +11,54 @@ _FORMAT = FeedFormat.RSS2.value
 _ATOM_NS = 'http://www.w3.org/2005/Atom'
 _NS = {'atom': _ATOM_NS}
 
-def extract(content: bytes, parsed) -> Tuple[Optional[Meta], List[Entry]]:
+def extract(root) -> Tuple[Optional[Meta], List[Entry], List[dict]]:
+    """Split a parsed document into its header and items, with the fields read from each item"""
     try:
-        root = etree.fromstring(content)
         channels = root.xpath('/rss/channel')
         if not channels:
-            return None, []
+            return None, [], []
 
-        # Entry
         item_elements = root.xpath('/rss/channel/item')
-        entries = [
-            Entry(
-                format=_FORMAT,
-                serialized=etree.tostring(item, encoding='unicode', pretty_print=False)
-            )
-            for item in item_elements
-        ]
+        fields = [read_fields(item) for item in item_elements]
+        header, fragments = split_document(root, item_elements)
+        meta = Meta(
+            format=_FORMAT,
+            serialized=header,
+            updated=compute_feed_updated_time(read_fields(channels[0]))
+        )
+        entries = [Entry(format=_FORMAT, serialized=fragment) for fragment in fragments]
+
+        return meta, entries, fields
+    except Exception as e:
+        logger.error(f"Failed to extract RSS2 feed: {e}", exc_info=True)
+        return None, [], []
+
+def extract_stream(content: bytes) -> Tuple[Optional[Meta], List[Entry], List[dict]]:
+    """Incremental variant of extract for large documents, dropping each item once serialized"""
+    try:
+        root, fragments, fields = iter_split(content, _is_item)
+        channels = root.xpath('/rss/channel') if root is not None else []
+        if not channels:
+            return None, [], []
 
-        # Meta
-        for item in item_elements:
-            item.getparent().remove(item)
-        
-        meta_serialized = etree.tostring(root, encoding='unicode', pretty_print=False)
         meta = Meta(
             format=_FORMAT,
-            serialized=meta_serialized,
-            updated=compute_feed_updated_time(parsed.feed)
+            serialized=etree.tostring(root, encoding='unicode', pretty_print=False),
+            updated=compute_feed_updated_time(read_fields(channels[0]))
         )
+        entries = [Entry(format=_FORMAT, serialized=fragment) for fragment in fragments]
 
-        return meta, entries
+        return meta, entries, fields
     except Exception as e:
         logger.error(f"Failed to extract RSS2 feed: {e}", exc_info=True)
-        return None, []
+        return None, [], []
+
+def _is_item(elem) -> bool:
+    channel = elem.getparent()
+    if elem.tag != 'item' or channel is None or channel.tag != 'channel':
+        return False
+    root = channel.getparent()
+    return root is not None and root.tag == 'rss' and root.getparent() is None
 
 def rebuild(meta: Meta,
             entries: List[Entry],
@@ -71,10 +88,6 @@ def rebuild(meta: Meta,
             # RSS 2.0 requires RFC 822 date format (e.g., 'Wed, 24 Nov 2025 12:00:00 GMT')
             last_build_dates[0].text = iso_to_http_date(cutoff_time)
 
-        for entry_data in entries:
-            item_elem = etree.fromstring(entry_data.serialized.encode('utf-8'))
-            channel.append(item_elem)
-        
-        return etree.tostring(root, encoding='utf-8', pretty_print=False, xml_declaration=True).decode('utf-8')
+        return splice_entries(root, channel, entries)
     except Exception as e:
         raise ValueError(f"Failed to rebuild RSS2 feed: {e}")
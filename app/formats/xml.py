@@ -0,0 +1,127 @@
+import io
+from lxml import etree
+from typing import Callable, Dict, List, Optional, Tuple
+from app.schemas import Entry
+from app.utils.time import parse_date_string
+
+_XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+_SPLICE_MARKER = 'ltff:entries'
+
+# Namespaces whose elements feedparser reads as core feed/entry fields
+_CORE_NS = {
+    None,
+    'http://www.w3.org/2005/Atom',
+    'http://purl.org/atom/ns#',
+}
+_DC_NS = {
+    'http://purl.org/dc/elements/1.1/': {'date': 'updated'},
+    'http://purl.org/dc/terms/': {'issued': 'published', 'modified': 'updated'},
+}
+
+# Element name (lowercased, as feedparser matches it) -> feedparser field
+_CORE_FIELDS = {
+    'id': 'id',
+    'guid': 'id',
+    'link': 'link',
+    'published': 'published',
+    'issued': 'published',
+    'pubdate': 'published',
+    'updated': 'updated',
+    'modified': 'updated',
+    'lastbuilddate': 'updated',
+}
+
+def read_fields(elem: etree._Element) -> Dict[str, object]:
+    """
+    Read the identity and date fields of a feed or entry element.
+    
+    Looks only at the direct children of elem and names the values the way
+    feedparser does (id, link, published(_parsed), updated(_parsed)), with
+    the last occurrence winning, so the helpers in app.utils.feed give the
+    same results as on feedparser output. Atom links are not resolved: their
+    'link' is left unset. Neither is xml:base, so documents using it must go
+    through feedparser.
+    """
+    fields = {}
+    for child in elem:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        qname = etree.QName(tag)
+        if qname.namespace in _CORE_NS:
+            field = _CORE_FIELDS.get(qname.localname.lower())
+        else:
+            field = _DC_NS.get(qname.namespace, {}).get(qname.localname.lower())
+        if field is None or (field == 'link' and qname.namespace is not None):
+            continue
+        fields[field] = ''.join(child.itertext()).strip()
+    
+    for field in ('published', 'updated'):
+        if field in fields:
+            fields[f'{field}_parsed'] = parse_date_string(fields[field])
+    return fields
+
+def split_document(root: etree._Element, entry_elements: List[etree._Element]) -> Tuple[str, List[str]]:
+    """
+    Serialize each entry element, then detach them and serialize the remaining header.
+    """
+    fragments = [
+        etree.tostring(elem, encoding='unicode', pretty_print=False, with_tail=False)
+        for elem in entry_elements
+    ]
+    for elem in entry_elements:
+        elem.getparent().remove(elem)
+    header = etree.tostring(root, encoding='unicode', pretty_print=False)
+    return header, fragments
+
+def root_tag(content: bytes) -> Optional[str]:
+    """Parse only as far as the root start tag and return its (namespaced) tag"""
+    for _, elem in etree.iterparse(io.BytesIO(content), events=('start',)):
+        return elem.tag
+    return None
+
+def iter_split(
+    content: bytes,
+    is_entry: Callable[[etree._Element], bool]
+) -> Tuple[etree._Element, List[str], List[dict]]:
+    """
+    Incremental counterpart of split_document working on the raw document.
+    
+    Each element matching is_entry is read, serialized and detached as soon as
+    its end tag is parsed, so only the header and one entry are ever held as a
+    tree, whatever the size of the document.
+    
+    Returns:
+        The header root, the serialized entries and their read_fields() values
+    """
+    root = None
+    fragments, fields = [], []
+    for event, elem in etree.iterparse(io.BytesIO(content), events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            continue
+        if is_entry(elem):
+            fields.append(read_fields(elem))
+            fragments.append(etree.tostring(elem, encoding='unicode', pretty_print=False, with_tail=False))
+            elem.getparent().remove(elem)
+    return root, fragments, fields
+
+def splice_entries(root: etree._Element, container: etree._Element, entries: List[Entry]) -> str:
+    """
+    Serialize a feed header with the stored entries inserted at the end of container.
+    
+    Entries are kept as pre-serialized XML fragments and concatenated into the
+    output as-is, so rebuilding costs one parse of the small header instead of
+    one parse per entry. Each fragment carries its own namespace declarations,
+    making the result equivalent to appending the parsed entries to container.
+    """
+    marker = etree.Comment(_SPLICE_MARKER)
+    container.append(marker)
+    try:
+        header = etree.tostring(root, encoding='unicode', pretty_print=False)
+    finally:
+        container.remove(marker)
+    
+    head, tail = header.rsplit(f'<!--{_SPLICE_MARKER}-->', 1)
+    return ''.join([_XML_DECLARATION, head, *(entry.serialized for entry in entries), tail])
@@ -3,8 +3,13 @@ from contextlib import asynccontextmanager
 
 from app.core.config import get_settings
 from app.core.logger import logger
-from app.core.db import init_db
+from app.core.db import init_db, connect_db, close_db
 from app.api import api_router
+from app.services.extractor import extraction_pool
+from app.services.fetcher import stop_syncs
+from app.services.http import http_client
+from app.services.retention import retention
+from app.services.scheduler import scheduler
 
 settings = get_settings()
 
@@ -13,10 +18,23 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     await init_db()
+    await connect_db()
+    await http_client.open()
+    extraction_pool.open()
+    if settings.scheduler_enabled:
+        scheduler.start()
+    if settings.cleanup_interval > 0:
+        retention.start()
     logger.info("Application started")
     yield
     # Shutdown
     logger.info("Application shutting down")
+    await retention.stop()
+    await scheduler.stop()
+    await stop_syncs()
+    extraction_pool.close()
+    await http_client.close()
+    await close_db()
 
 app = FastAPI(
     title="Let the Feeds Fly",
@@ -13,6 +13,15 @@ class Meta(BaseModel):
     serialized: str = Field(..., description="Serialized feed header (XML/JSON)")
     updated_at: Optional[str] = Field(None, description="Last update time")
     created_at: Optional[str] = Field(None, description="Creation time")
+    last_checked_at: Optional[str] = Field(None, description="Last time upstream was checked")
+    next_check_at: Optional[str] = Field(None, description="Next scheduled upstream check")
+    unchanged_count: int = Field(0, description="Consecutive upstream checks without changes")
+    body_hash: Optional[str] = Field(None, description="Hash of the last raw upstream body")
+    body_fingerprint: Optional[str] = Field(None, description="Hash of the last upstream body without volatile header fields")
+    failure_count: int = Field(0, description="Consecutive failed upstream syncs")
+    failing_since: Optional[str] = Field(None, description="Time of the first of the consecutive failed syncs")
+    retry_after: Optional[str] = Field(None, description="Time before which upstream is not synced again after a failure")
+    sync_count: int = Field(0, description="Completed upstream syncs that held a fetch lease, changed or not")
     
     class Config:
         from_attributes = True
@@ -25,8 +34,10 @@ class Entry(BaseModel):
     guid: Optional[str] = Field(None, description="GUID/ID")
     hash: Optional[str] = Field(None, description="Content hash for deduplication")
     serialized: str = Field(..., description="Serialized entry content (XML/JSON)")
+    fingerprint: Optional[str] = Field(None, description="Hash of the stored content and published time")
     published_at: Optional[str] = Field(None, description="Published time")
     discovered_at: Optional[str] = Field(None, description="Discovery time")
+    last_seen_at: Optional[str] = Field(None, description="Last time the entry was listed in an extracted upstream body")
     created_at: Optional[str] = Field(None, description="Creation time")
     
     class Config:
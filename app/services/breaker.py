@@ -0,0 +1,174 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from curl_cffi.requests.exceptions import ConnectionError, HTTPError, Timeout
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+class CircuitOpen(Exception):
+    """Upstream fetches from the host are suspended after repeated failures"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+def is_host_failure(error: Exception) -> bool:
+    """
+    Whether a fetch error shows the host itself failing: unreachable, timing
+    out or answering 429/5xx, as opposed to a problem with one feed such as
+    an oversized body.
+    """
+    if isinstance(error, HTTPError):
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status is not None and (status == 429 or status >= 500)
+    return isinstance(error, (ConnectionError, Timeout))
+
+class _Circuit:
+    """Concurrency slots and failure state of one upstream host"""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        # Fetches waiting for a slot or running
+        self.users = 0
+        self.failures = 0
+        self.trips = 0
+        self.opened_until: Optional[float] = None
+        self.probing = False
+
+class HostBreaker:
+    """
+    Per-host concurrency cap and circuit breaker for upstream fetches.
+
+    At most `max_concurrency` fetches per host run at once; further ones wait
+    for a slot. After `failure_threshold` consecutive host failures (see
+    is_host_failure) the host's circuit opens and its fetches fail at once
+    with CircuitOpen for `open_seconds`, doubled on every consecutive trip up
+    to `max_open_seconds`.
+    Once that time has passed a single probe fetch is let through: success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, max_concurrency: int, failure_threshold: int, open_seconds: float, max_open_seconds: float):
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._circuits: Dict[str, _Circuit] = {}
+        self.trips = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def guard(self, url: str) -> AsyncIterator[None]:
+        """Run a fetch of the URL within its host's limits, recording whether the host failed"""
+        host = urlsplit(url).hostname or ''
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _Circuit(self.max_concurrency)
+
+        circuit.users += 1
+        probe = False
+        try:
+            probe = self._admit(host, circuit)
+            if circuit.semaphore is None:
+                yield
+            else:
+                async with circuit.semaphore:
+                    # The circuit may have opened while this fetch waited for a slot
+                    if not probe:
+                        probe = self._admit(host, circuit)
+                    yield
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            if is_host_failure(e):
+                self._failure(host, circuit)
+            raise
+        else:
+            self._success(host, circuit)
+        finally:
+            if probe and circuit.probing:
+                # The probe ended without a verdict (cancelled, or a feed error): let the next fetch probe
+                circuit.probing = False
+            circuit.users -= 1
+            # Idle healthy hosts need no state
+            if circuit.users == 0 and circuit.failures == 0:
+                self._circuits.pop(host, None)
+
+    def is_open(self, url: str) -> bool:
+        """Whether fetches from the URL's host are currently refused"""
+        circuit = self._circuits.get(urlsplit(url).hostname or '')
+        if circuit is None or circuit.opened_until is None:
+            return False
+        return circuit.probing or circuit.opened_until > time.monotonic()
+
+    def _admit(self, host: str, circuit: _Circuit) -> bool:
+        """Refuse the fetch while the circuit is open; returns whether it is the probe"""
+        if circuit.opened_until is None:
+            return False
+        retry_in = circuit.opened_until - time.monotonic()
+        if retry_in > 0 or circuit.probing:
+            self.rejected += 1
+            raise CircuitOpen(host, max(retry_in, 0.0))
+        circuit.probing = True
+        logger.info(f"Probing upstream host {host}")
+        return True
+
+    def _failure(self, host: str, circuit: _Circuit) -> None:
+        circuit.failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if circuit.probing or (circuit.opened_until is None and circuit.failures >= self.failure_threshold):
+            circuit.trips += 1
+            self.trips += 1
+            open_for = min(self.open_seconds * 2 ** (circuit.trips - 1), self.max_open_seconds)
+            circuit.opened_until = time.monotonic() + open_for
+            circuit.probing = False
+            metrics.circuit_open.set(1, host)
+            logger.warning(f"Circuit opened for {host} after {circuit.failures} failures, retrying in {open_for:.0f}s")
+
+    def _success(self, host: str, circuit: _Circuit) -> None:
+        if circuit.opened_until is not None:
+            metrics.circuit_open.remove(host)
+            logger.info(f"Circuit closed for {host}")
+        circuit.failures = 0
+        circuit.trips = 0
+        circuit.opened_until = None
+        circuit.probing = False
+
+    def tripped(self) -> List[dict]:
+        """Hosts whose circuit is open, or half-open with a probe in flight"""
+        now = time.monotonic()
+        return [
+            {
+                "host": host,
+                "failures": circuit.failures,
+                "trips": circuit.trips,
+                "retry_in": round(max(circuit.opened_until - now, 0.0), 1),
+                "probing": circuit.probing,
+            }
+            for host, circuit in sorted(self._circuits.items())
+            if circuit.opened_until is not None
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "hosts": len(self._circuits),
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "tripped": self.tripped(),
+        }
+
+host_breaker = HostBreaker(
+    max_concurrency=settings.upstream_host_concurrency,
+    failure_threshold=settings.breaker_failures,
+    open_seconds=settings.breaker_open_seconds,
+    max_open_seconds=settings.failure_backoff_max
+)
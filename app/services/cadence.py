@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+# Upper bound on backoff steps, large enough for any realistic ceiling
+_MAX_BACKOFF_STEPS = 32
+
+def _parse_iso(iso_time: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(iso_time.replace('Z', '+00:00')).timestamp()
+    except (ValueError, AttributeError):
+        return None
+
+def estimate_publish_interval(history: List[Tuple[str, str]]) -> Optional[float]:
+    """
+    Estimate the average number of seconds between two entries of a feed.
+
+    The rate is measured from the oldest sampled entry up to now, so a feed
+    that went quiet after a burst of entries is estimated as slowing down.
+    Entries claiming to be published after they were discovered are counted
+    at their discovery time.
+
+    Args:
+        history: (published_at, discovered_at) pairs of recent entries
+
+    Returns:
+        Mean interval in seconds, or None without at least two usable entries
+    """
+    timestamps = []
+    for published_at, discovered_at in history:
+        times = [t for t in (_parse_iso(published_at), _parse_iso(discovered_at)) if t is not None]
+        if times:
+            timestamps.append(min(times))
+
+    if len(timestamps) < 2:
+        return None
+
+    now = datetime.now(timezone.utc).timestamp()
+    span = now - min(timestamps)
+    return max(span, 0.0) / len(timestamps)
+
+def compute_poll_interval(
+    history: List[Tuple[str, str]],
+    unchanged_count: int,
+    default: float,
+    minimum: float,
+    maximum: float,
+    backoff_factor: float
+) -> float:
+    """
+    Compute how long to wait before checking a feed's upstream again.
+
+    The base interval is the feed's observed publishing interval (or `default`
+    without enough history), stretched by `backoff_factor` for every
+    consecutive check that found no change, and clamped to [minimum, maximum].
+
+    Args:
+        history: (published_at, discovered_at) pairs of recent entries
+        unchanged_count: Consecutive upstream checks without changes
+        default: Interval used when the publishing rate is unknown
+        minimum: Floor of the interval in seconds
+        maximum: Ceiling of the interval in seconds
+        backoff_factor: Multiplier applied per unchanged check
+
+    Returns:
+        Interval in seconds
+    """
+    interval = estimate_publish_interval(history)
+    if interval is None:
+        interval = default
+    interval *= backoff_factor ** min(unchanged_count, _MAX_BACKOFF_STEPS)
+    return min(max(interval, minimum), maximum)
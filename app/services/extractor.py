@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.formats.handler import extract
+from app.schemas import Meta, Entry
+
+settings = get_settings()
+
+_EXECUTORS = ("process", "thread")
+
+class ExtractionPool:
+    """
+    Executor running feed extraction off the event loop.
+
+    feedparser and lxml hold the CPU (and the GIL) for as long as a document
+    takes to parse, so a multi-megabyte feed parsed inline stalls every other
+    request on the worker. Documents of at least `inline_max_bytes` are handed
+    to a process pool (or a thread pool, which keeps the loop responsive but
+    still contends for the GIL); smaller ones are cheaper to parse inline than
+    to ship to a worker.
+    """
+
+    def __init__(self, executor: str, workers: int, inline_max_bytes: int):
+        if executor not in _EXECUTORS:
+            raise ValueError(f"Unsupported extract executor: {executor}")
+        self.executor = executor
+        self.workers = workers
+        self.inline_max_bytes = inline_max_bytes
+        self._pool: Optional[Executor] = None
+        self.inline = 0
+        self.offloaded = 0
+
+    def open(self) -> None:
+        if self._pool is not None:
+            return
+        if self.executor == "process":
+            # spawn: forking a process that runs an event loop and database threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract")
+        logger.info(f"Extraction pool opened ({self.workers} {self.executor} workers)")
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        logger.info("Extraction pool closed")
+
+    async def extract(
+        self,
+        content: bytes,
+        url: str,
+        discovered_at: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Tuple[Optional[Meta], List[Entry], Optional[str]]:
+        job = partial(
+            extract,
+            content,
+            url,
+            discovered_at=discovered_at,
+            etag=etag,
+            last_modified=last_modified
+        )
+        started = time.perf_counter()
+        if len(content) < self.inline_max_bytes:
+            self.inline += 1
+            mode = "inline"
+            result = job()
+        else:
+            if self._pool is None:
+                self.open()
+            self.offloaded += 1
+            mode = self.executor
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, job)
+
+        meta = result[0]
+        metrics.extract_seconds.observe(time.perf_counter() - started, meta.format if meta else "unknown", mode)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor,
+            "workers": self.workers,
+            "inline_max_bytes": self.inline_max_bytes,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+        }
+
+extraction_pool = ExtractionPool(
+    executor=settings.extract_executor,
+    workers=settings.extract_workers,
+    inline_max_bytes=settings.extract_inline_max_bytes
+)
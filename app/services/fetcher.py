@@ -1,17 +1,169 @@
-from curl_cffi.requests import AsyncSession
-from typing import Optional
-from app.core.db import upsert_meta, upsert_entry, now_iso
-from app.formats.handler import extract
+import asyncio
+import os
+import socket
+import time
+from typing import Dict, Optional
+from app.core.db import (
+    upsert_meta, upsert_entries, touch_meta, record_sync_failure, get_meta_state,
+    get_body_fingerprints, set_body_fingerprints,
+    acquire_lease, release_lease, lease_held, now_iso
+)
+from app.core import metrics
 from app.core.logger import logger
 from app.core.config import get_settings
+from app.services.breaker import CircuitOpen, host_breaker
+from app.services.extractor import extraction_pool
+from app.services.http import http_client
+from app.services.singleflight import SingleFlight
+from app.utils.feed import compute_body_fingerprints
+from app.utils.time import get_future_time
 
 settings = get_settings()
 
+_sync_flight = SingleFlight()
+
+# Identifies this process in the fetch_leases table
+_lease_owner = f"{socket.gethostname()}:{os.getpid()}"
+# How often a process waiting on another one's fetch lease checks for its release
+_LEASE_POLL_SECONDS = 0.2
+# Syncs that waited for another process instead of fetching
+_lease_waits = 0
+
+# Syncs started in the background by revalidate(), by feed URL
+_revalidations: Dict[str, asyncio.Task] = {}
+_revalidated = 0
+
+# Syncs whose upstream body matched the last extracted one, exactly or once normalized
+_unchanged_bodies = 0
+# Extracted entries that were already stored unchanged
+_unchanged_entries = 0
+
+async def sync_feed(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None
+) -> int:
+    """
+    Sync a feed with its upstream, coalescing concurrent syncs of the same URL.
+
+    Callers arriving while a sync for the URL is already in flight share its
+    result instead of issuing another upstream request. Across processes
+    sharing the database, a fetch lease lets only one of them fetch the URL;
+    the others wait for it and then read what it stored.
+    """
+    return await _sync_flight.do(url, lambda: _sync_leased(url, etag, last_modified))
+
+async def _sync_leased(url: str, etag: Optional[str], last_modified: Optional[str]) -> int:
+    if settings.fetch_lease_ttl <= 0:
+        return await _sync_recording_failure(url, etag, last_modified)
+    
+    # Read before trying the lease: the holder may finish its sync right after refusing it
+    state = await get_meta_state(url)
+    synced_before = state.sync_count if state else None
+    if not await acquire_lease(url, _lease_owner, get_future_time(settings.fetch_lease_ttl)):
+        return await _wait_for_lease(url, synced_before)
+    synced = False
+    try:
+        status_code = await _sync_recording_failure(url, etag, last_modified)
+        synced = True
+        return status_code
+    finally:
+        await release_lease(url, _lease_owner, synced)
+
+async def _sync_recording_failure(url: str, etag: Optional[str], last_modified: Optional[str]) -> int:
+    """Sync with upstream, backing off from the feed in the meta table when the sync fails"""
+    try:
+        return await sync_with_upstream(url, etag=etag, last_modified=last_modified)
+    except CircuitOpen:
+        # The host was not contacted; its breaker already holds off retries
+        raise
+    except Exception:
+        retry_after = await record_sync_failure(url, settings.failure_backoff_base, settings.failure_backoff_max)
+        if retry_after:
+            logger.info(f"Sync of {url} failed, serving stored data until {retry_after}")
+        raise
+
+async def _wait_for_lease(url: str, synced_before: Optional[int]) -> int:
+    """
+    Wait for the process holding the feed's lease to finish its sync, then
+    report its outcome from the feed's sync count read before the lease was refused.
+    """
+    global _lease_waits
+    _lease_waits += 1
+    logger.debug(f"Feed {url} is being synced by another process, waiting for it")
+    
+    while await lease_held(url):
+        await asyncio.sleep(_LEASE_POLL_SECONDS)
+    
+    state = await get_meta_state(url)
+    if state is None or state.sync_count == synced_before:
+        raise RuntimeError(f"Sync of {url} by another process did not complete")
+    return 200
+
+def _record_fetch(url: str, response, seconds: float) -> None:
+    status = str(response.status_code) if response is not None else "error"
+    metrics.upstream_responses.inc(metrics.feed_label(url), status)
+    metrics.upstream_seconds.observe(seconds, status)
+    if response is not None and response.content:
+        metrics.upstream_bytes.observe(len(response.content))
+
+def revalidate(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None
+) -> None:
+    """Sync a feed in the background unless a background sync of it is already running"""
+    global _revalidated
+    if url in _revalidations:
+        return
+    _revalidated += 1
+    task = asyncio.create_task(sync_feed(url, etag=etag, last_modified=last_modified))
+    _revalidations[url] = task
+    task.add_done_callback(lambda t: _revalidation_done(url, t))
+
+def _revalidation_done(url: str, task: asyncio.Task) -> None:
+    if _revalidations.get(url) is task:
+        del _revalidations[url]
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background refresh of {url} failed: {task.exception()}")
+
+async def stop_syncs() -> None:
+    """Cancel background refreshes and every upstream sync still running at shutdown"""
+    tasks = [*_revalidations.values()]
+    for task in tasks:
+        task.cancel()
+    # Cancelling a caller leaves the shared sync running behind its shield
+    await _sync_flight.cancel_all()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def sync_stats() -> dict:
+    """Counters of the upstream sync single-flight layer, background refreshes and skipped unchanged content"""
+    return {
+        **_sync_flight.stats(),
+        "unchanged_bodies": _unchanged_bodies,
+        "unchanged_entries": _unchanged_entries,
+        "revalidated": _revalidated,
+        "revalidating": len(_revalidations),
+        "lease_waits": _lease_waits,
+    }
+
 async def sync_with_upstream(
     url: str,
     etag: Optional[str] = None,
     last_modified: Optional[str] = None
 ) -> int:
+    """
+    Fetch a feed and store its header and new or changed entries.
+    
+    Upstreams that ignore conditional requests are detected by fingerprinting
+    the body: when it matches the last extracted body, exactly or apart from
+    volatile header fields, extraction and writes are skipped and the sync is
+    reported as 304 Not Modified.
+    
+    The fetch runs under the host's concurrency cap and circuit breaker;
+    network errors, 429 and 5xx responses count as host failures.
+    """
+    global _unchanged_bodies, _unchanged_entries
     logger.info(f"Fetching feed: {url}")
     
     headers = {}
@@ -20,31 +172,52 @@ async def sync_with_upstream(
     if last_modified:
         headers['If-Modified-Since'] = last_modified
     
-    async with AsyncSession() as client:
-        try:
-            response = await client.get(
-                url,
-                headers=headers,
-                impersonate="chrome",
-                timeout=settings.http_timeout,
-                allow_redirects=True
-            )
-            
-            if response.status_code == 304:
-                logger.info(f"Feed not modified: {url}")
-                return 304
-            
+    try:
+        async with host_breaker.guard(url):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = await http_client.get(
+                    url,
+                    headers=headers,
+                    timeout=settings.http_timeout,
+                    allow_redirects=True
+                )
+            finally:
+                _record_fetch(url, response, time.perf_counter() - started)
+            if response.status_code == 429 or response.status_code >= 500:
+                response.raise_for_status()
+        
+        if response.status_code != 304:
             response.raise_for_status()
-            content = response.content
-            
-        except Exception as e:
-            logger.error(f"HTTP error fetching {url}: {e}")
-            raise e
+        
+    except CircuitOpen as e:
+        logger.info(f"Not fetching {url}: {e}")
+        raise e
+    
+    except Exception as e:
+        logger.error(f"HTTP error fetching {url}: {e}")
+        raise e
+    
+    if response.status_code == 304:
+        logger.info(f"Feed not modified: {url}")
+        await touch_meta(url)
+        return 304
+    
+    content = response.content
+    
+    body_hash, body_fingerprint = compute_body_fingerprints(content)
+    stored_hash, stored_fingerprint = await get_body_fingerprints(url)
+    if body_hash == stored_hash or body_fingerprint == stored_fingerprint:
+        logger.info(f"Feed body unchanged: {url}")
+        _unchanged_bodies += 1
+        await touch_meta(url)
+        return 304
     
     response_etag = response.headers.get('ETag')
     response_last_modified = response.headers.get('Last-Modified')
     
-    meta, entries, parsed = extract(
+    meta, entries, warning = await extraction_pool.extract(
         content,
         url, 
         discovered_at=now_iso(),
@@ -52,21 +225,19 @@ async def sync_with_upstream(
         last_modified=response_last_modified
     )
     
-    if not meta or not parsed:
+    if not meta:
         logger.error(f"Failed to extract feed metadata from {url}")
         raise ValueError("Failed to extract feed metadata")
     
-    if parsed.bozo:
-        logger.warning(f"Feedparser reported error for {url}: {parsed.bozo_exception}")
+    if warning:
+        logger.warning(f"Feedparser reported error for {url}: {warning}")
     
+    # The body's fingerprints are only recorded once its entries are stored, so
+    # a sync failing in between extracts the same body again next time
     await upsert_meta(meta)
-
-    for idx, entry in enumerate(entries):
-        try:
-            await upsert_entry(entry)
-        except Exception as e:
-            logger.error(f"Failed to process entry {idx} from {url}: {e}", exc_info=True)
-            continue
+    stored = await upsert_entries(url, entries)
+    await set_body_fingerprints(url, body_hash, body_fingerprint)
+    _unchanged_entries += len(entries) - stored
     
-    logger.info(f"Successfully synced {len(entries)} entries from {url}")
+    logger.info(f"Successfully synced {url}: {stored} of {len(entries)} entries new or changed")
     return 200
@@ -0,0 +1,148 @@
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from curl_cffi import AsyncCurl, CurlMOpt, CurlOpt
+from curl_cffi.requests import AsyncSession, Response
+
+from app.core.config import get_settings
+from app.core.logger import logger
+
+settings = get_settings()
+
+# libcurl CURLPIPE_MULTIPLEX: share one HTTP/2 connection between requests to a host
+_CURLPIPE_MULTIPLEX = 2
+# libcurl CURL_WRITEFUNC_ERROR: returned by a write callback to abort the transfer
+_CURL_WRITEFUNC_ERROR = 0xFFFFFFFF
+# libcurl CURLE_FILESIZE_EXCEEDED: transfer stopped by CURLOPT_MAXFILESIZE_LARGE
+_CURLE_FILESIZE_EXCEEDED = 63
+
+class BodyTooLarge(Exception):
+    """The upstream body exceeded the configured maximum size"""
+
+class UpstreamClient:
+    """
+    Long-lived pooled HTTP client shared by every upstream fetch.
+
+    Connections, TLS sessions and DNS lookups are reused across fetches
+    instead of being set up again for every feed. libcurl caps the total and
+    per-host connection counts and multiplexes requests over HTTP/2 where the
+    upstream supports it.
+
+    Bodies are received chunk by chunk and the transfer is aborted as soon as
+    more than `max_body_bytes` (after decompression) arrived, or when the
+    upstream sends nothing for `read_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_host_connections: int,
+        http2: bool,
+        max_body_bytes: int,
+        read_timeout: float
+    ):
+        self.max_connections = max_connections
+        self.max_host_connections = max_host_connections
+        self.http2 = http2
+        self.max_body_bytes = max_body_bytes
+        self.read_timeout = read_timeout
+        self._session: Optional[AsyncSession] = None
+        self._curl: Optional[AsyncCurl] = None
+        self._inflight: Counter = Counter()
+        self.requests = 0
+        self.errors = 0
+        self.oversized = 0
+
+    async def open(self) -> None:
+        if self._session is not None:
+            return
+        self._curl = AsyncCurl()
+        self._curl.setopt(CurlMOpt.MAX_TOTAL_CONNECTIONS, self.max_connections)
+        self._curl.setopt(CurlMOpt.MAX_HOST_CONNECTIONS, self.max_host_connections)
+        self._curl.setopt(CurlMOpt.PIPELINING, _CURLPIPE_MULTIPLEX if self.http2 else 0)
+        self._session = AsyncSession(
+            async_curl=self._curl,
+            max_clients=self.max_connections,
+            curl_options={
+                # Refuse bodies announced as too large before reading them
+                CurlOpt.MAXFILESIZE_LARGE: self.max_body_bytes,
+                # Abort slow-drip transfers averaging under 1 byte/s over read_timeout
+                CurlOpt.LOW_SPEED_LIMIT: 1,
+                CurlOpt.LOW_SPEED_TIME: max(int(self.read_timeout), 1),
+            }
+        )
+        logger.info(
+            f"HTTP client opened (max {self.max_connections} connections, "
+            f"{self.max_host_connections} per host)"
+        )
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+        await self._session.close()
+        await self._curl.close()
+        self._session = None
+        self._curl = None
+        logger.info("HTTP client closed")
+
+    async def get(self, url: str, headers: Dict[str, str], **kwargs) -> Response:
+        """GET a URL; the returned response's content holds the bounded body"""
+        if self._session is None:
+            await self.open()
+
+        body = bytearray()
+        oversized = False
+
+        def receive(chunk: bytes):
+            nonlocal oversized
+            if len(body) + len(chunk) > self.max_body_bytes:
+                oversized = True
+                return _CURL_WRITEFUNC_ERROR
+            body.extend(chunk)
+            return len(chunk)
+
+        host = urlsplit(url).hostname or ''
+        self.requests += 1
+        self._inflight[host] += 1
+        try:
+            response = await self._session.get(
+                url,
+                headers=headers,
+                impersonate="chrome",
+                http_version=None if self.http2 else "v1",
+                content_callback=receive,
+                **kwargs
+            )
+            response.content = bytes(body)
+            return response
+        except Exception as e:
+            self.errors += 1
+            if oversized or getattr(e, 'code', None) == _CURLE_FILESIZE_EXCEEDED:
+                self.oversized += 1
+                raise BodyTooLarge(f"Body of {url} exceeds {self.max_body_bytes} bytes") from e
+            raise
+        finally:
+            self._inflight[host] -= 1
+            if not self._inflight[host]:
+                del self._inflight[host]
+
+    def stats(self) -> dict:
+        return {
+            "open": self._session is not None,
+            "max_connections": self.max_connections,
+            "max_host_connections": self.max_host_connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "oversized": self.oversized,
+            "inflight": sum(self._inflight.values()),
+            "inflight_by_host": dict(self._inflight.most_common(10)),
+        }
+
+http_client = UpstreamClient(
+    max_connections=settings.http_max_connections,
+    max_host_connections=settings.http_max_host_connections,
+    http2=settings.http2,
+    max_body_bytes=settings.http_max_body_bytes,
+    read_timeout=settings.http_read_timeout
+)
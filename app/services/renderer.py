@@ -0,0 +1,54 @@
+import time
+from typing import List, Optional
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.formats import FeedFormat
+from app.formats.handler import rebuild
+from app.schemas import Meta, Entry
+from app.utils.cache import LRUCache
+from app.utils.compression import compress
+from app.utils.time import floor_iso_time
+
+settings = get_settings()
+
+render_cache = LRUCache(settings.render_cache_max_bytes)
+
+def render(
+    meta: Meta,
+    entries: List[Entry],
+    format: FeedFormat,
+    self_url: str,
+    cutoff_time: str,
+    content_etag: str,
+    encoding: Optional[str] = None
+) -> bytes:
+    """
+    Rebuild a feed document, sharing the output between identical requests.
+    
+    The cutoff stamped into the document is rounded down to the cache bucket,
+    so every reader of the same content, URL and bucket gets the same bytes
+    and only the first one pays for the rebuild. Compressed variants are
+    cached next to the document, so each is compressed once per change too.
+    """
+    cutoff_time = floor_iso_time(cutoff_time, settings.render_cache_bucket)
+    key = (content_etag, format, self_url, cutoff_time)
+    
+    if encoding is not None:
+        compressed = render_cache.get((*key, encoding))
+        if compressed is not None:
+            return compressed
+    
+    output = render_cache.get(key)
+    if output is None:
+        started = time.perf_counter()
+        output = rebuild(meta, entries, format, self_url, cutoff_time).encode('utf-8')
+        metrics.rebuild_seconds.observe(time.perf_counter() - started, format.value)
+        render_cache.put(key, output)
+    
+    if encoding is None:
+        return output
+    
+    compressed = compress(output, encoding)
+    render_cache.put((*key, encoding), compressed)
+    return compressed
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+from app.core.db import list_feeds, count_entries_since, delete_entries_after, incremental_vacuum
+from app.core.logger import logger
+from app.utils.time import get_cutoff_time
+
+settings = get_settings()
+
+# Free pages handed back to the filesystem per write-locked vacuum step
+_VACUUM_PAGES = 1000
+
+class RetentionJob:
+    """
+    Periodic cleanup bounding the size of the entries table.
+
+    Entries published within `max_delay_days` are still maturing for some
+    delay and never deleted. Among the older ones, those discovered more than
+    `max_age_days` ago and those beyond the newest `max_entries` are deleted,
+    but the newest `keep_entries` in serving order are always kept, so a feed
+    delayed by up to `max_delay_days` never comes back empty. Entries the
+    upstream document still lists are kept too, or the next sync would
+    discover them again as new. Deletes and
+    incremental vacuum steps run in small batches, each taking the write lock
+    only briefly.
+    """
+
+    def __init__(
+        self,
+        interval: int,
+        max_age_days: int,
+        max_entries: int,
+        keep_entries: int,
+        max_delay_days: int,
+        batch_size: int
+    ):
+        self.interval = interval
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.keep_entries = keep_entries
+        self.max_delay_days = max_delay_days
+        self.batch_size = batch_size
+        self._runner: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.deleted = 0
+        self.reclaimed_bytes = 0
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            logger.info(f"Retention job started (interval {self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._runner is None:
+            return
+        self._runner.cancel()
+        await asyncio.gather(self._runner, return_exceptions=True)
+        self._runner = None
+        logger.info("Retention job stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> None:
+        deleted = 0
+        for feed in await list_feeds():
+            deleted += await self._prune(feed)
+
+        reclaimed = 0
+        while True:
+            freed = await incremental_vacuum(_VACUUM_PAGES)
+            reclaimed += freed
+            if not freed:
+                break
+            await asyncio.sleep(0)
+
+        self.runs += 1
+        self.deleted += deleted
+        self.reclaimed_bytes += reclaimed
+        logger.info(f"Retention run deleted {deleted} entries and reclaimed {reclaimed} bytes")
+
+    async def _prune(self, feed: str) -> int:
+        # Entries are served newest discovered first, so both limits cut off a tail of that
+        # order, counted over the entries already mature at the longest delay
+        mature = get_cutoff_time(self.max_delay_days * 86400) if self.max_delay_days > 0 else None
+        offset = None
+        if self.max_entries > 0:
+            offset = self.max_entries
+        if self.max_age_days > 0:
+            recent = await count_entries_since(feed, get_cutoff_time(self.max_age_days * 86400), mature)
+            offset = recent if offset is None else min(offset, recent)
+        if offset is None:
+            return 0
+        offset = max(offset, self.keep_entries)
+
+        deleted = 0
+        while True:
+            batch = await delete_entries_after(feed, offset, self.batch_size, mature)
+            deleted += batch
+            if batch < self.batch_size:
+                break
+            await asyncio.sleep(0)
+        if deleted:
+            logger.debug(f"Deleted {deleted} entries of {feed}")
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._runner is not None,
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "reclaimed_bytes": self.reclaimed_bytes,
+        }
+
+retention = RetentionJob(
+    interval=settings.cleanup_interval,
+    max_age_days=settings.cleanup_after_days,
+    max_entries=settings.cleanup_max_entries,
+    keep_entries=settings.cleanup_keep_entries,
+    max_delay_days=settings.cleanup_max_delay_days,
+    batch_size=settings.cleanup_batch_size
+)
@@ -0,0 +1,123 @@
+import asyncio
+import random
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+from app.core.db import get_due_feeds, get_poll_history, schedule_next_check, now_iso
+from app.core.logger import logger
+from app.services.cadence import compute_poll_interval
+from app.services.fetcher import sync_feed
+from app.utils.time import get_cutoff_time, get_future_time
+
+settings = get_settings()
+
+# How often the scheduler looks for due feeds
+_POLL_SECONDS = 30.0
+
+class FeedScheduler:
+    """
+    Background refresher keeping every known feed in sync with its upstream.
+
+    Due feeds are picked from the meta table on every poll and synced with at
+    most `concurrency` upstream requests in flight. Each feed is rescheduled
+    after an interval adapted to its publishing rate and to how many checks in
+    a row found nothing new, bounded by [min_interval, max_interval] and
+    randomized by `jitter` so feeds added together spread out over time.
+    """
+
+    def __init__(
+        self,
+        interval: int,
+        concurrency: int,
+        jitter: float,
+        min_interval: int,
+        max_interval: int,
+        backoff_factor: float
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            logger.info(f"Feed scheduler started (interval {self.interval}s)")
+
+    async def stop(self) -> None:
+        tasks = [*self._inflight.values()]
+        if self._runner is not None:
+            tasks.append(self._runner)
+            self._runner = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+        logger.info("Feed scheduler stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                due = await get_due_feeds(now_iso(), get_cutoff_time(self.interval))
+                for feed, etag, last_modified in due:
+                    if feed in self._inflight:
+                        continue
+                    task = asyncio.create_task(self._refresh(feed, etag, last_modified))
+                    self._inflight[feed] = task
+                    task.add_done_callback(lambda _, feed=feed: self._inflight.pop(feed, None))
+            except Exception as e:
+                logger.error(f"Feed scheduler poll failed: {e}", exc_info=True)
+            await asyncio.sleep(self._jittered(_POLL_SECONDS))
+
+    async def _refresh(self, feed: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        async with self._semaphore:
+            try:
+                await sync_feed(feed, etag=etag, last_modified=last_modified)
+                self.refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Scheduled sync failed for {feed}: {e}")
+            try:
+                interval = await self._next_interval(feed)
+                await schedule_next_check(feed, get_future_time(self._jittered(interval)))
+            except Exception as e:
+                logger.error(f"Failed to reschedule {feed}: {e}")
+
+    async def _next_interval(self, feed: str) -> float:
+        unchanged_count, history = await get_poll_history(feed)
+        interval = compute_poll_interval(
+            history,
+            unchanged_count,
+            default=self.interval,
+            minimum=self.min_interval,
+            maximum=self.max_interval,
+            backoff_factor=self.backoff_factor
+        )
+        logger.debug(f"Next check of {feed} in {interval:.0f}s ({unchanged_count} unchanged checks)")
+        return interval
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._runner is not None,
+            "inflight": len(self._inflight),
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+        }
+
+scheduler = FeedScheduler(
+    interval=settings.scheduler_interval,
+    concurrency=settings.scheduler_concurrency,
+    jitter=settings.scheduler_jitter,
+    min_interval=settings.poll_min_interval,
+    max_interval=settings.poll_max_interval,
+    backoff_factor=settings.poll_backoff_factor
+)
@@ -0,0 +1,48 @@
+"""
+Rewrite stored feed payloads with another storage codec, in place.
+
+    python -m app.tools.recompress [--codec zlib|none] [--batch-size 500] [--vacuum]
+
+Defaults to the configured STORAGE_CODEC. Safe to run while the service is
+up: rows are converted in short batched transactions and every row records
+its own codec, so readers handle a partly converted database. Rows shrunk
+in place leave half-empty pages behind; --vacuum compacts the file
+afterwards, blocking writers while it runs.
+"""
+import argparse
+import asyncio
+import os
+
+from app.core.config import get_settings
+from app.core.db import init_db, recompress_rows, incremental_vacuum, checkpoint_db, vacuum_db
+from app.core.logger import logger
+
+settings = get_settings()
+
+async def run(codec: str, batch_size: int, vacuum: bool) -> None:
+    await init_db()
+    size_before = os.path.getsize(settings.database)
+    target = None if codec == "none" else codec
+    
+    for table in ("meta", "entries"):
+        converted = await recompress_rows(table, target, batch_size)
+        logger.info(f"Rewrote {converted} {table} rows with codec {codec}")
+    
+    if vacuum:
+        await vacuum_db()
+    else:
+        while await incremental_vacuum(1000):
+            pass
+    await checkpoint_db()
+    logger.info(f"Database file {size_before} -> {os.path.getsize(settings.database)} bytes")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codec", default=settings.storage_codec, choices=["none", "zlib"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--vacuum", action="store_true", help="compact the database file afterwards")
+    args = parser.parse_args()
+    asyncio.run(run(args.codec, args.batch_size, args.vacuum))
+
+if __name__ == "__main__":
+    main()
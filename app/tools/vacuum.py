@@ -0,0 +1,34 @@
+"""
+Switch the database to incremental auto-vacuum and compact it.
+
+    python -m app.tools.vacuum
+
+Databases created before incremental auto-vacuum was the default keep the
+pages freed by cleanup inside the file. Switching them takes one full
+VACUUM, which rewrites the whole file, needs about as much free disk space
+again and blocks writers until it finishes: run it while the service is
+stopped. Afterwards the cleanup job hands freed pages back on its own.
+"""
+import argparse
+import asyncio
+import os
+
+from app.core.config import get_settings
+from app.core.db import init_db, checkpoint_db, vacuum_db
+from app.core.logger import logger
+
+settings = get_settings()
+
+async def run() -> None:
+    await init_db()
+    size_before = os.path.getsize(settings.database)
+    await vacuum_db(incremental=True)
+    await checkpoint_db()
+    logger.info(f"Database file {size_before} -> {os.path.getsize(settings.database)} bytes")
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.strip().splitlines()[0]).parse_args()
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by the total size of its values in bytes.
+    
+    Values larger than the whole budget are not cached.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[bytes]:
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key: Hashable, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        
+        previous = self._items.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._items[key] = value
+        self.size += len(value)
+        
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._items),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,87 @@
+import zlib
+from typing import Optional, Tuple, Union
+
+# Preset dictionaries: markup that recurs in nearly every document of a format.
+# zlib favours matches near the end of the dictionary, so the most common
+# strings come last. Rows record the codec they were written with, so a new
+# dictionary must get a new codec name instead of replacing one of these.
+_XML_COMMON = (
+    '<![CDATA[]]>&amp;&lt;&gt;&quot;&#39; target="_blank" rel="noopener noreferrer" '
+    '<img src="https://" alt="" /><br /><br/></p><p></a><a href="https://'
+    '</li><li></ul><ul></strong><strong></em><em></div><div class="'
+)
+_DICTIONARIES = {
+    'rss2': (
+        _XML_COMMON
+        + ' xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        ' xmlns:content="http://purl.org/rss/1.0/modules/content/"'
+        ' xmlns:atom="http://www.w3.org/2005/Atom"'
+        '<category><![CDATA[</category><comments>https://</comments>'
+        '<dc:creator><![CDATA[</dc:creator><content:encoded><![CDATA['
+        '</content:encoded> GMT</pubDate><pubDate>Mon, Tue, Wed, Thu, Fri, Sat, Sun, '
+        '</guid><guid isPermaLink="false"><guid isPermaLink="true">https://'
+        '</description><description><![CDATA[</link><link>https://</title><title><item></item>'
+    ).encode('utf-8'),
+    'atom': (
+        _XML_COMMON
+        + '<author><name></name><uri>https://</uri></author>'
+        '<category term="" /><content type="html"><summary type="html">'
+        '</content></summary><link rel="alternate" type="text/html" href="https://'
+        '</published><published>:00Z</updated><updated>T00:00:00Z'
+        '</id><id>tag:</id><id>https://</title><title type="html"><title>'
+        '<entry xmlns="http://www.w3.org/2005/Atom"></entry>'
+    ).encode('utf-8'),
+    'jsonfeed': (
+        '<p></p><a href=\\"https://\\"></a><img src=\\"https://\\" />'
+        '"authors": [{"name": "url": "https://"tags": ["image": "https://'
+        '"summary": "content_text": "content_html": "date_modified": "date_published": "'
+        '"external_url": "https://"title": "url": "https://"id": "https://'
+    ).encode('utf-8'),
+}
+
+_LEVEL = 6
+
+def encode(text: str, codec: Optional[str], format: str) -> Tuple[Union[str, bytes], Optional[str]]:
+    """
+    Compress a serialized payload for storage.
+
+    Args:
+        text: Serialized XML/JSON payload
+        codec: 'zlib' to compress, None to store the text as is
+        format: Feed format of the payload, selecting the preset dictionary
+
+    Returns:
+        (stored value, codec recorded with the row); the value is bytes
+        when compressed and the unchanged text otherwise
+    """
+    if codec is None:
+        return text, None
+    if codec != 'zlib':
+        raise ValueError(f"Unsupported storage codec: {codec}")
+
+    zdict = _DICTIONARIES.get(format)
+    if zdict is None:
+        return zlib.compress(text.encode('utf-8'), _LEVEL), 'zlib'
+    compressor = zlib.compressobj(_LEVEL, zdict=zdict)
+    return compressor.compress(text.encode('utf-8')) + compressor.flush(), f'zlib-{format}-1'
+
+def decode(value: Union[str, bytes], codec: Optional[str], format: str) -> str:
+    """
+    Restore a serialized payload stored with encode().
+
+    Args:
+        value: Stored value
+        codec: Codec recorded with the row (None for plain text)
+        format: Feed format of the payload
+
+    Returns:
+        The serialized XML/JSON text
+    """
+    if codec is None:
+        return value
+    if codec == 'zlib':
+        return zlib.decompress(value).decode('utf-8')
+    if codec == f'zlib-{format}-1':
+        decompressor = zlib.decompressobj(zdict=_DICTIONARIES[format])
+        return (decompressor.decompress(value) + decompressor.flush()).decode('utf-8')
+    raise ValueError(f"Unsupported storage codec: {codec}")
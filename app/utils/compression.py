@@ -0,0 +1,68 @@
+import gzip
+from typing import Callable, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:  # optional dependency
+        zstd = None
+
+# Available content codings, in order of preference when a client accepts several
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {}
+if zstd is not None:
+    ENCODERS['zstd'] = lambda data: zstd.compress(data)
+if brotli is not None:
+    ENCODERS['br'] = lambda data: brotli.compress(data, quality=5)
+ENCODERS['gzip'] = lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for a response from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Accept-Encoding request header (can be None)
+
+    Returns:
+        The preferred available coding the client accepts with the highest
+        q-value, or None for the uncompressed (identity) representation
+
+    Example:
+        >>> negotiate_encoding('gzip, deflate;q=0.5')
+        'gzip'
+        >>> negotiate_encoding('gzip;q=0')
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in ENCODERS:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Encode data with one of the available content codings"""
+    return ENCODERS[encoding](data)
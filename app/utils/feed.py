@@ -1,6 +1,7 @@
+import re
 import json
 import hashlib
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 from app.utils.time import normalize_time_struct
 
 
@@ -67,3 +68,35 @@ def compute_entry_guid(parsed_entry) -> Optional[str]:
     """
     return parsed_entry.get('id') or parsed_entry.get('guid')
 
+
+
+# Feed-level elements that many generators rewrite on every request
+_VOLATILE_HEADER = re.compile(
+    rb'<(lastBuildDate|pubDate|updated|dc:date|generator)\b[^>]*>.*?</\1\s*>|<!--.*?-->',
+    re.DOTALL | re.IGNORECASE
+)
+_FIRST_ENTRY = re.compile(rb'<(item|entry)[\s>]', re.IGNORECASE)
+
+
+def compute_body_fingerprints(content: bytes) -> Tuple[str, str]:
+    """
+    Fingerprint a raw upstream body, exactly and ignoring volatile header fields.
+    
+    The normalized fingerprint drops comments and the feed-level build/update
+    times and generator found before the first item or entry, so a body whose
+    only change is a fresh lastBuildDate still matches the previous one.
+    Entry-level elements are never touched.
+    
+    Args:
+        content: Raw response body
+        
+    Returns:
+        (exact, normalized) SHA256 hash strings
+    """
+    exact = hashlib.sha256(content).hexdigest()
+    
+    match = _FIRST_ENTRY.search(content)
+    split = match.start() if match else len(content)
+    header = _VOLATILE_HEADER.sub(b'', content[:split])
+    normalized = hashlib.sha256(header + content[split:]).hexdigest()
+    return exact, normalized
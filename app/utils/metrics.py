@@ -0,0 +1,165 @@
+import bisect
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds, from an indexed SQLite lookup to a slow upstream
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+# Upper bounds in bytes, from a small response to the largest accepted upstream body
+SIZE_BUCKETS = tuple(1024 * 4 ** n for n in range(8))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        key = tuple(str(v) for v in values)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge:
+    """Current value with a fixed set of label names; removed series are no longer exported"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *values: str) -> None:
+        self._values[tuple(str(v) for v in values)] = value
+
+    def remove(self, *values: str) -> None:
+        self._values.pop(tuple(str(v) for v in values), None)
+
+    def samples(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative histogram with a fixed set of label names and bucket bounds"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: per-bucket (non-cumulative) counts, then the sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *values: str) -> None:
+        key = tuple(str(v) for v in values)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = state
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            labels = _format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total[0])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+    def time(self, *values: str) -> Callable:
+        """Decorator observing the duration of every call of an async function"""
+        def decorator(fn: Callable) -> Callable:
+            @wraps(fn)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, *values)
+            return wrapper
+        return decorator
+
+
+class BoundedLabel:
+    """
+    Caps the number of distinct values a label takes.
+
+    The first `max_values` values seen keep their own series; any later one is
+    reported as `overflow`, so a proxy serving unbounded feed URLs still
+    exports a bounded number of series.
+    """
+
+    def __init__(self, max_values: int, overflow: str = 'other'):
+        self.max_values = max_values
+        self.overflow = overflow
+        self._admitted: Dict[str, None] = {}
+
+    def __call__(self, value: str) -> str:
+        if value in self._admitted:
+            return value
+        if len(self._admitted) < self.max_values:
+            self._admitted[value] = None
+            return value
+        return self.overflow
+
+
+class Registry:
+    """Set of metrics rendered together in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
@@ -33,6 +33,31 @@ def normalize_time_struct(time_struct) -> Optional[str]:
         return None
 
 
+def parse_date_string(value: str):
+    """
+    Parse a feed date string into a UTC time.struct_time.
+    
+    Uses feedparser's date handlers, so every format feedparser understands
+    (RFC 822, W3C-DTF/ISO 8601 and the rest) gives the same result as the
+    *_parsed fields of a feedparser document.
+    
+    Args:
+        value: Date string as found in the feed
+        
+    Returns:
+        time.struct_time in UTC, or None if the string is not a known date format
+        
+    Example:
+        >>> normalize_time_struct(parse_date_string('Mon, 24 Nov 2025 12:30:45 +0100'))
+        '2025-11-24T11:30:45Z'
+    """
+    if not value:
+        return None
+    
+    from feedparser.datetimes import _parse_date
+    return _parse_date(value)
+
+
 def get_cutoff_time(delay_seconds: int) -> str:
     """
     Calculate cutoff time (now - delay_seconds) in unified ISO8601 format.
@@ -52,6 +77,52 @@ def get_cutoff_time(delay_seconds: int) -> str:
     return cutoff_dt.replace(microsecond=0).isoformat().replace('+00:00', 'Z')
 
 
+def floor_iso_time(iso_time: str, seconds: int) -> str:
+    """
+    Round an ISO8601 time string down to a multiple of the given seconds.
+    
+    Args:
+        iso_time: ISO8601 time string (e.g., '2025-11-24T12:30:45Z')
+        seconds: Bucket size in seconds (values below 2 return the input unchanged)
+        
+    Returns:
+        ISO8601 string with 'Z' suffix, or the input if conversion fails
+        
+    Example:
+        >>> floor_iso_time('2025-11-24T12:30:45Z', 60)
+        '2025-11-24T12:30:00Z'
+    """
+    if seconds < 2:
+        return iso_time
+    
+    try:
+        dt = datetime.fromisoformat(iso_time.replace('Z', '+00:00'))
+        timestamp = int(dt.timestamp()) // seconds * seconds
+        floored_dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        return floored_dt.isoformat().replace('+00:00', 'Z')
+    except (ValueError, AttributeError):
+        return iso_time
+
+
+def get_future_time(seconds: float) -> str:
+    """
+    Calculate a time in the future (now + seconds) in unified ISO8601 format.
+    
+    Args:
+        seconds: Number of seconds to add to current time
+        
+    Returns:
+        ISO8601 string with 'Z' suffix, no microseconds
+        
+    Example:
+        >>> get_future_time(900)  # 15 minutes from now
+        '2025-11-24T12:45:45Z'
+    """
+    from datetime import timedelta
+    future_dt = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+    return future_dt.replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+
+
 def get_latest_iso_time(*time_strings: str) -> Optional[str]:
     """
     Get the latest time from multiple ISO8601 time strings.
@@ -97,4 +168,29 @@ def iso_to_http_date(iso_time: str) -> Optional[str]:
         dt = datetime.fromisoformat(iso_time.replace('Z', '+00:00'))
         return formatdate(timeval=dt.timestamp(), localtime=False, usegmt=True)
     except (ValueError, AttributeError):
-        return None
\ No newline at end of file
+        return None
+
+
+def seconds_since(iso_time: str) -> Optional[float]:
+    """
+    Calculate the number of seconds elapsed since an ISO8601 time string.
+    
+    Args:
+        iso_time: ISO8601 time string (e.g., '2025-11-24T12:30:45Z')
+        
+    Returns:
+        Elapsed seconds (negative if the time is in the future),
+        or None if conversion fails
+        
+    Example:
+        >>> seconds_since(get_cutoff_time(60))
+        60.0
+    """
+    if not iso_time:
+        return None
+    
+    try:
+        dt = datetime.fromisoformat(iso_time.replace('Z', '+00:00'))
+        return (datetime.now(timezone.utc) - dt).total_seconds()
+    except (ValueError, AttributeError):
+        return None
@@ -0,0 +1,92 @@
+"""
+Event-loop lag while large feeds are extracted.
+
+A ticker coroutine sleeps for a fixed period and records how late it wakes
+up, standing in for the other requests served by the worker. Meanwhile a
+batch of large synthetic RSS documents is extracted, interleaved with small
+ones, once inline on the loop and once through each executor.
+
+    python -m benchmarks.extract_lag [--items 5000] [--feeds 8]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from app.formats.handler import extract
+from app.services.extractor import ExtractionPool
+
+_TICK = 0.005
+
+def make_feed(items: int) -> bytes:
+    body = ''.join(
+        f'<item><title>Item {i}</title><link>https://example.com/{i}</link>'
+        f'<guid>https://example.com/{i}</guid>'
+        f'<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>'
+        f'<description>{"lorem ipsum dolor sit amet " * 20}</description></item>'
+        for i in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<rss version="2.0"><channel><title>Benchmark</title>'
+        '<link>https://example.com/</link><description>Benchmark</description>'
+        f'{body}</channel></rss>'
+    ).encode('utf-8')
+
+async def ticker(lags: List[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(_TICK)
+        lags.append(loop.time() - start - _TICK)
+
+async def run(mode: str, large: bytes, small: bytes, feeds: int) -> None:
+    pool = None
+    if mode != "inline":
+        pool = ExtractionPool(executor=mode, workers=2, inline_max_bytes=len(small) + 1)
+        pool.open()
+        # Warm the workers up so process start-up is not measured
+        await asyncio.gather(*(pool.extract(large, "warmup", "2024-01-01T00:00:00Z") for _ in range(2)))
+
+    async def one(content: bytes, n: int):
+        url = f"https://example.com/{n}.xml"
+        if pool is None:
+            return extract(content, url, discovered_at="2024-01-01T00:00:00Z")
+        return await pool.extract(content, url, "2024-01-01T00:00:00Z")
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(_TICK * 4)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(large if n % 2 else small, n) for n in range(feeds * 2)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await tick
+    if pool is not None:
+        pool.close()
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{mode:>8}: wall {elapsed * 1000:8.1f} ms | loop lag "
+        f"median {statistics.median(lags) * 1000:7.1f} ms, "
+        f"p99 {p99 * 1000:7.1f} ms, max {lags[-1] * 1000:7.1f} ms"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000, help="items per large feed")
+    parser.add_argument("--feeds", type=int, default=8, help="number of large feeds")
+    args = parser.parse_args()
+
+    large, small = make_feed(args.items), make_feed(10)
+    print(f"{args.feeds} large feeds of {len(large) / 1e6:.1f} MB mixed with {args.feeds} small ones")
+    for mode in ("inline", "thread", "process"):
+        asyncio.run(run(mode, large, small, args.feeds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+End-to-end load test of the /feed endpoint against a stand-in upstream.
+
+Starts the stand-in upstream (benchmarks.upstream) and the app
+(`uvicorn app.main:app`) on a fresh database in a temporary directory,
+warms every feed up once, then drives /feed with concurrent readers. Each
+reader cycles through the feeds and, like a feed reader polling, sends the
+ETag it last got back in If-None-Match for a configurable share of requests.
+
+Results are printed as one JSON document (or written with --output) so runs
+can be compared:
+
+    python -m benchmarks.load [--feeds 4] [--readers 32] [--requests 5000] [--latency 0.05]
+    python -m benchmarks.load --workers 2 --env FRESHNESS_TTL=0 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from curl_cffi.requests import AsyncSession
+
+from benchmarks.upstream import FORMATS, StandInUpstream
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _percentile(values: List[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+def _db_bytes(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p))
+
+async def _wait_ready(session: AsyncSession, base: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with status {process.returncode}")
+        try:
+            if (await session.get(f"{base}/", timeout=1)).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("App did not start within 30s")
+
+async def _drive(
+    base: str,
+    feeds: List[str],
+    readers: int,
+    requests: int,
+    conditional: float,
+    query: Dict[str, str],
+    seed: int
+) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    response_bytes = 0
+    remaining = requests
+    rng = random.Random(seed)
+
+    async def reader(session: AsyncSession, n: int) -> None:
+        nonlocal remaining, response_bytes
+        etags: Dict[str, str] = {}
+        position = n
+        while remaining > 0:
+            remaining -= 1
+            feed = feeds[position % len(feeds)]
+            position += 1
+            headers = {"Accept-Encoding": "gzip"}
+            if feed in etags and rng.random() < conditional:
+                headers["If-None-Match"] = etags[feed]
+            url = f"{base}/feed?{urlencode({'url': feed, **query})}"
+            started = time.perf_counter()
+            response = await session.get(url, headers=headers, timeout=120)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            response_bytes += len(response.content)
+            if response.headers.get("ETag"):
+                etags[feed] = response.headers["ETag"]
+
+    async with AsyncSession(max_clients=readers) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(reader(session, n) for n in range(readers)))
+        seconds = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p90": round(_percentile(latencies, 90) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "response_bytes": response_bytes,
+    }
+
+async def run(args: argparse.Namespace) -> dict:
+    upstream = StandInUpstream(args.entries, args.body_bytes, not args.no_etag, args.latency).start()
+    feeds = [upstream.url(format, n) for format in args.formats for n in range(args.feeds)]
+    query = {"delay": str(args.delay), "unit": "minute", "limit": str(args.limit)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "ltff.db")
+        env = {**os.environ, "DATABASE": database, "LOG_LEVEL": "WARNING"}
+        env.update(item.split("=", 1) for item in args.env)
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning",
+             "--no-access-log"],
+            cwd=_ROOT, env=env
+        )
+        base = f"http://127.0.0.1:{args.port}"
+        try:
+            async with AsyncSession() as session:
+                await _wait_ready(session, base, process)
+                for feed in feeds:
+                    await session.get(f"{base}/feed?{urlencode({'url': feed, **query})}", timeout=120)
+            warmup_upstream = upstream.stats()["requests"]
+
+            results = await _drive(base, feeds, args.readers, args.requests, args.conditional, query, args.seed)
+
+            async with AsyncSession() as session:
+                stats = (await session.get(f"{base}/stats", timeout=10)).json()
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            upstream.stop()
+
+        upstream_stats = upstream.stats()
+        results["upstream"] = {
+            **upstream_stats,
+            "warmup_requests": warmup_upstream,
+            "load_requests": upstream_stats["requests"] - warmup_upstream,
+        }
+        results["db_bytes"] = _db_bytes(database)
+        results["app_stats"] = stats
+
+    return results
+
+def environment() -> dict:
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT, capture_output=True, text=True
+    ).stdout.strip()
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def emit(report: dict, output: Optional[str]) -> None:
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--feeds", type=int, default=4, help="feeds per format")
+    parser.add_argument("--entries", type=int, default=50, help="entries per upstream document")
+    parser.add_argument("--body-bytes", type=int, default=1000, help="approximate size of each entry's text")
+    parser.add_argument("--no-etag", action="store_true", help="upstream ignores conditional requests")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every upstream response")
+    parser.add_argument("--readers", type=int, default=32, help="concurrent readers")
+    parser.add_argument("--requests", type=int, default=5000, help="total /feed requests")
+    parser.add_argument("--conditional", type=float, default=0.8,
+                        help="share of repeat requests sending If-None-Match")
+    parser.add_argument("--delay", type=int, default=0, help="delay in minutes")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="app setting for the run, e.g. FRESHNESS_TTL=0 (repeatable)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    results = asyncio.run(run(args))
+    emit({"benchmark": "load", "environment": environment(), "config": config, "results": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmarks of the per-sync and per-request hot paths.
+
+For every format, times handler.extract on a synthetic upstream document,
+handler.rebuild of a delayed feed from the extracted entries, and
+get_mature_entries on a database filled with the same entries. Results are
+printed as one JSON document (or written with --output) so runs can be
+compared:
+
+    python -m benchmarks.micro [--entries 50 500] [--body-bytes 1000] [--iterations 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from app.core import db
+from app.formats import FeedFormat
+from app.formats.handler import extract, rebuild
+from benchmarks.load import emit, environment
+from benchmarks.upstream import FORMATS, make_document
+
+_DISCOVERED_AT = "2024-01-01T00:00:00Z"
+_CUTOFF = "2099-01-01T00:00:00Z"
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "iterations": len(samples),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 1),
+    }
+
+def _time(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+async def _time_async(fn: Callable, iterations: int) -> Dict[str, float]:
+    await fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+async def run(entries: int, body_bytes: int, iterations: int, limit: int, directory: str) -> List[dict]:
+    db.settings.database = os.path.join(directory, f"micro-{entries}.db")
+    await db.init_db()
+    await db.connect_db()
+    results = []
+    try:
+        for format in FORMATS:
+            url = f"https://{format}.example.com/feed"
+            document = make_document(format, format, entries, body_bytes)
+            meta, items, _ = extract(document, url, discovered_at=_DISCOVERED_AT)
+            await db.upsert_meta(meta)
+            await db.upsert_entries(url, items)
+            served = items[:limit]
+
+            results.append({
+                "format": format,
+                "entries": entries,
+                "document_bytes": len(document),
+                "extract": _time(lambda: extract(document, url, discovered_at=_DISCOVERED_AT), iterations),
+                "rebuild": _time(lambda: rebuild(meta, served, FeedFormat(format), url, _CUTOFF), iterations),
+                "get_mature_entries": await _time_async(
+                    lambda: db.get_mature_entries(url, _CUTOFF, limit=limit), iterations
+                ),
+                "get_mature_validators": await _time_async(
+                    lambda: db.get_mature_validators(url, _CUTOFF, limit=limit), iterations
+                ),
+            })
+    finally:
+        await db.close_db()
+    return results
+
+async def run_all(args: argparse.Namespace) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for entries in args.entries:
+            results.extend(await run(entries, args.body_bytes, args.iterations, args.limit, directory))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[50, 500], help="entries per document")
+    parser.add_argument("--body-bytes", type=int, default=1000, help="approximate size of each entry's text")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20, help="entries served per request")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    results = asyncio.run(run_all(args))
+    emit({"benchmark": "micro", "environment": environment(), "config": config, "results": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Database size and read/rebuild throughput per storage codec.
+
+Fills a fresh database per codec with synthetic RSS items carrying HTML
+article bodies, then times the per-request path: loading the mature entries
+of a feed and rebuilding the document.
+
+    python -m benchmarks.storage [--feeds 50] [--entries 400] [--reads 2000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from app.core import db
+from app.formats import FeedFormat
+from app.formats.handler import rebuild
+from app.schemas import Meta, Entry
+
+_WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but "
+    "have an they you were her she there been one all we their has would when if so no will more "
+    "feed thread reply post server release update version user comment discussion performance"
+).split()
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return ''.join(
+        f'<p>{" ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 90)))} '
+        f'<a href="https://example.com/{rng.getrandbits(32):x}">link</a></p>'
+        for _ in range(count)
+    )
+
+def make_entries(feed: str, count: int, rng: random.Random):
+    meta = Meta(
+        feed=feed,
+        format=FeedFormat.RSS2.value,
+        serialized=(
+            '<rss xmlns:atom="http://www.w3.org/2005/Atom" version="2.0"><channel>'
+            f'<title>{feed}</title><link>{feed}</link><description>Benchmark</description>'
+            '<lastBuildDate>Mon, 01 Jan 2024 00:00:00 GMT</lastBuildDate></channel></rss>'
+        ),
+        updated="2024-01-01T00:00:00Z"
+    )
+    entries = []
+    for i in range(count):
+        link = f"{feed}/t/{i}"
+        entries.append(Entry(
+            feed=feed,
+            format=FeedFormat.RSS2.value,
+            guid=link,
+            hash=f"{feed}#{i}",
+            serialized=(
+                f'<item><title>Thread {i}</title><link>{link}</link><guid>{link}</guid>'
+                f'<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>'
+                f'<description><![CDATA[{_paragraphs(rng, rng.randint(2, 8))}]]></description></item>'
+            ),
+            published_at=f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            discovered_at=f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z"
+        ))
+    return meta, entries
+
+async def run(codec: str, feeds: int, entries: int, reads: int, directory: str) -> None:
+    path = os.path.join(directory, f"{codec}.db")
+    db.settings.database = path
+    db._storage_codec = None if codec == "none" else codec
+
+    await db.init_db()
+    await db.connect_db()
+    rng = random.Random(42)
+    urls = [f"https://forum{n}.example.com" for n in range(feeds)]
+    started = time.perf_counter()
+    for url in urls:
+        meta, items = make_entries(url, entries, rng)
+        await db.upsert_meta(meta)
+        await db.upsert_entries(url, items)
+    write_seconds = time.perf_counter() - started
+    await db.close_db()
+    size = os.path.getsize(path) + (os.path.getsize(path + "-wal") if os.path.exists(path + "-wal") else 0)
+
+    await db.connect_db()
+    read_seconds = rebuild_seconds = 0.0
+    for n in range(reads):
+        url = urls[n % feeds]
+        started = time.perf_counter()
+        meta = await db.get_meta(url)
+        items = await db.get_mature_entries(url, "2099-01-01T00:00:00Z", limit=20)
+        read_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        rebuild(meta, items, FeedFormat.RSS2, url, "2024-01-01T00:00:00Z")
+        rebuild_seconds += time.perf_counter() - started
+    await db.close_db()
+
+    print(
+        f"{codec:>5}: {size / 1e6:8.1f} MB | write {feeds * entries / write_seconds:8.0f} entries/s | "
+        f"read {reads / read_seconds:7.0f} req/s | read+rebuild {reads / (read_seconds + rebuild_seconds):7.0f} req/s"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=400, help="entries per feed")
+    parser.add_argument("--reads", type=int, default=2000, help="requests of 20 entries each")
+    args = parser.parse_args()
+
+    print(f"{args.feeds} feeds x {args.entries} entries, {args.reads} reads of 20 entries")
+    with tempfile.TemporaryDirectory() as directory:
+        for codec in ("none", "zlib"):
+            asyncio.run(run(codec, args.feeds, args.entries, args.reads, directory))
+
+if __name__ == "__main__":
+    main()
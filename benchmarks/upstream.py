@@ -0,0 +1,238 @@
+"""
+Local stand-in for upstream feed servers.
+
+Serves synthetic RSS 2.0, Atom and JSON Feed documents from a threaded HTTP
+server on 127.0.0.1, so benchmarks never depend on the network:
+
+    /<format>/<n>.xml    e.g. /rss2/0.xml, /atom/3.xml, /jsonfeed/1.json
+
+Each path is a distinct feed. Documents are generated once per feed from a
+fixed seed, so every run serves the same bytes. Entry count, body size,
+ETag/304 support and response latency are configurable, and requests are
+counted per status so a benchmark can report upstream load.
+
+    python -m benchmarks.upstream [--port 8765] [--entries 50] [--latency 0.05]
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+FORMATS = ("rss2", "atom", "jsonfeed")
+
+_CONTENT_TYPES = {
+    "rss2": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+    "jsonfeed": "application/feed+json; charset=utf-8",
+}
+
+_WORDS = (
+    "the of and to in is that for it as was with be by on not this are or from at which but have an "
+    "feed thread reply post server release update version user comment discussion performance"
+).split()
+
+# Entries are published one hour apart, the newest at this time
+_NEWEST = 1704067200  # 2024-01-01T00:00:00Z
+
+def _text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def make_document(format: str, feed: str, entries: int, body_bytes: int, seed: int = 0) -> bytes:
+    """
+    Build a synthetic feed document.
+
+    Args:
+        format: rss2, atom or jsonfeed
+        feed: Feed identifier, used in titles and links
+        entries: Number of entries
+        body_bytes: Approximate size of each entry's description/content
+        seed: Random seed of the entry text
+
+    Returns:
+        The encoded document
+    """
+    rng = random.Random(f"{seed}:{format}:{feed}")
+    base = f"https://{feed}.example.com"
+    items = []
+    for i in range(entries):
+        link = f"{base}/t/{i}"
+        timestamp = _NEWEST - i * 3600
+        text = _text(rng, body_bytes)
+        if format == "rss2":
+            items.append(
+                f"<item><title>Thread {i}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{formatdate(timestamp, usegmt=True)}</pubDate>"
+                f"<description><![CDATA[<p>{text}</p>]]></description></item>"
+            )
+        elif format == "atom":
+            iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+            items.append(
+                f"<entry><title>Thread {i}</title><link href=\"{link}\"/><id>{link}</id>"
+                f"<published>{iso}</published><updated>{iso}</updated>"
+                f"<content type=\"html\">&lt;p&gt;{text}&lt;/p&gt;</content></entry>"
+            )
+        else:
+            iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+            items.append({
+                "id": link, "url": link, "title": f"Thread {i}",
+                "date_published": iso, "content_html": f"<p>{text}</p>",
+            })
+
+    if format == "rss2":
+        document = (
+            '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f'<title>{feed}</title><link>{base}/</link><description>Benchmark feed</description>'
+            f'{"".join(items)}</channel></rss>'
+        )
+    elif format == "atom":
+        document = (
+            '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>{feed}</title><id>{base}/</id><link href="{base}/"/>'
+            f'<updated>{time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(_NEWEST))}</updated>'
+            f'{"".join(items)}</feed>'
+        )
+    elif format == "jsonfeed":
+        document = json.dumps({
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": feed, "home_page_url": f"{base}/", "items": items,
+        })
+    else:
+        raise ValueError(f"Unsupported format: {format}")
+    return document.encode("utf-8")
+
+class StandInUpstream:
+    """
+    Threaded HTTP server serving synthetic feeds.
+
+    With `etag` enabled, responses carry a strong ETag and requests sending
+    it back in If-None-Match get 304 Not Modified. Every response is delayed
+    by `latency` seconds.
+    """
+
+    def __init__(
+        self,
+        entries: int = 50,
+        body_bytes: int = 1000,
+        etag: bool = True,
+        latency: float = 0.0,
+        port: int = 0
+    ):
+        self.entries = entries
+        self.body_bytes = body_bytes
+        self.etag = etag
+        self.latency = latency
+        self._documents: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+        self.requests: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def url(self, format: str, n: int) -> str:
+        return f"{self.base_url}/{format}/{n}.{'json' if format == 'jsonfeed' else 'xml'}"
+
+    def start(self) -> "StandInUpstream":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": sum(self.requests.values()),
+                "by_status": {str(k): v for k, v in sorted(self.requests.items())},
+                "bytes_sent": self.bytes_sent,
+            }
+
+    def _document(self, path: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            if path in self._documents:
+                return self._documents[path]
+        parts = path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in FORMATS:
+            return None
+        body = make_document(parts[0], parts[1].split(".")[0], self.entries, self.body_bytes)
+        document = (body, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+        with self._lock:
+            self._documents[path] = document
+        return document
+
+    def _record(self, status: int, size: int) -> None:
+        with self._lock:
+            self.requests[status] = self.requests.get(status, 0) + 1
+            self.bytes_sent += size
+
+    def _handler(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if upstream.latency:
+                    time.sleep(upstream.latency)
+                document = upstream._document(self.path)
+                if document is None:
+                    self._reply(404, b"")
+                    return
+                body, etag = document
+                if upstream.etag and self.headers.get("If-None-Match") == etag:
+                    self._reply(304, b"", {"ETag": etag})
+                    return
+                headers = {"Content-Type": _CONTENT_TYPES[self.path.strip("/").split("/")[0]]}
+                if upstream.etag:
+                    headers["ETag"] = etag
+                self._reply(200, body, headers)
+
+            def _reply(self, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                upstream._record(status, len(body))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--body-bytes", type=int, default=1000)
+    parser.add_argument("--no-etag", action="store_true", help="ignore conditional requests")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    upstream = StandInUpstream(args.entries, args.body_bytes, not args.no_etag, args.latency, args.port).start()
+    print(f"Serving {', '.join(upstream.url(f, 0) for f in FORMATS)} ...")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        upstream.stop()
+
+if __name__ == "__main__":
+    main()
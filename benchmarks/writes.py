@@ -0,0 +1,64 @@
+"""
+Write throughput under concurrent syncs.
+
+Runs waves of concurrent simulated syncs against a fresh database: each
+stores a feed header, a handful of new entries and the upstream check
+bookkeeping, the writes one upstream sync makes.
+
+    python -m benchmarks.writes [--feeds 200] [--entries 5] [--concurrency 1 8 64 256]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from app.core import db
+from benchmarks.storage import make_entries
+
+async def sync(feed: str, meta, items) -> None:
+    await db.upsert_meta(meta)
+    await db.upsert_entries(feed, items)
+    await db.schedule_next_check(feed, db.now_iso())
+    await db.touch_meta(feed)
+
+async def run(concurrency: int, feeds: int, entries: int, directory: str) -> None:
+    db.settings.database = os.path.join(directory, f"writes-{concurrency}.db")
+    await db.init_db()
+    await db.connect_db()
+    rng = random.Random(42)
+    syncs = [make_entries(f"https://forum{n}.example.com", entries, rng) for n in range(feeds)]
+    batches = db.db_stats()["write_batches"] if hasattr(db, "db_stats") else None
+
+    started = time.perf_counter()
+    for first in range(0, feeds, concurrency):
+        await asyncio.gather(*(sync(meta.feed, meta, items) for meta, items in syncs[first:first + concurrency]))
+    seconds = time.perf_counter() - started
+    if batches is not None:
+        batches = db.db_stats()["write_batches"] - batches
+    await db.close_db()
+
+    print(
+        f"concurrency {concurrency:>4}: {feeds / seconds:8.0f} syncs/s, {feeds * 4 / seconds:8.0f} writes/s"
+        + (f" in {batches} transactions" if batches is not None else "")
+    )
+
+async def run_all(levels, feeds: int, entries: int, directory: str) -> None:
+    # One event loop for every run: the database module's write lock is bound to it
+    for concurrency in levels:
+        await run(concurrency, feeds, entries, directory)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=5, help="new entries per sync")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64, 256])
+    args = parser.parse_args()
+
+    print(f"{args.feeds} syncs of {args.entries} entries each")
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_all(args.concurrency, args.feeds, args.entries, directory))
+
+if __name__ == "__main__":
+    main()
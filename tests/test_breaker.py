@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from curl_cffi.requests.exceptions import ConnectionError
+
+from app.services.breaker import CircuitOpen, HostBreaker
+from app.services.http import BodyTooLarge
+
+URL = "https://feeds.example.com/rss"
+
+
+async def fail(breaker: HostBreaker, error: Exception) -> None:
+    with pytest.raises(type(error)):
+        async with breaker.guard(URL):
+            raise error
+
+
+async def test_feed_errors_do_not_trip_the_circuit():
+    breaker = HostBreaker(max_concurrency=2, failure_threshold=2, open_seconds=60, max_open_seconds=60)
+    for _ in range(3):
+        await fail(breaker, BodyTooLarge("too large"))
+    assert not breaker.is_open(URL)
+
+    for _ in range(2):
+        await fail(breaker, ConnectionError("refused"))
+    assert breaker.is_open(URL)
+
+
+async def test_cancelled_probe_lets_the_next_fetch_probe():
+    breaker = HostBreaker(max_concurrency=2, failure_threshold=1, open_seconds=0, max_open_seconds=0)
+    await fail(breaker, ConnectionError("refused"))
+
+    async def hang():
+        async with breaker.guard(URL):
+            await asyncio.Event().wait()
+
+    probe = asyncio.create_task(hang())
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpen):
+        async with breaker.guard(URL):
+            pass
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    async with breaker.guard(URL):
+        pass
+    assert not breaker.is_open(URL)
@@ -0,0 +1,27 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from app.core import db
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_INIT = "import asyncio; from app.core.db import init_db; asyncio.run(init_db())"
+
+
+def test_concurrent_workers_migrate_once(tmp_path):
+    # Worker processes started together all run init_db on the same new database
+    for run in range(3):
+        path = str(tmp_path / f"ltff-{run}.db")
+        env = {**os.environ, "DATABASE": path, "LOG_LEVEL": "WARNING"}
+        workers = [
+            subprocess.Popen([sys.executable, "-c", _INIT], cwd=_ROOT, env=env, stderr=subprocess.PIPE, text=True)
+            for _ in range(6)
+        ]
+        for worker in workers:
+            _, stderr = worker.communicate(timeout=120)
+            assert worker.returncode == 0, stderr
+
+        with sqlite3.connect(path) as connection:
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+        assert version == len(db._MIGRATIONS)
@@ -0,0 +1,30 @@
+import aiosqlite
+import pytest
+
+from app.core import db
+
+
+@pytest.fixture
+async def database(tmp_path, monkeypatch):
+    path = str(tmp_path / "ltff.db")
+    monkeypatch.setattr(db.settings, "database", path)
+    await db.init_db()
+    async with aiosqlite.connect(path) as connection:
+        yield connection
+
+
+async def query_plan(connection: aiosqlite.Connection, sql: str) -> str:
+    async with connection.execute(f"EXPLAIN QUERY PLAN {sql}", ("", "", 1)) as cursor:
+        return " | ".join(row[-1] for row in await cursor.fetchall())
+
+
+async def test_mature_entries_walk_discovery_index(database):
+    plan = await query_plan(database, db._MATURE_ENTRIES_SQL)
+    assert "idx_entries_feed_discovered_published" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+async def test_mature_validators_use_covering_index(database):
+    plan = await query_plan(database, db._MATURE_VALIDATORS_SQL)
+    assert "COVERING INDEX" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from app.core import db
+
+FEED = "https://feeds.example.com/rss"
+
+
+@pytest.fixture
+async def database(tmp_path, monkeypatch):
+    path = str(tmp_path / "ltff.db")
+    monkeypatch.setattr(db.settings, "database", path)
+    await db.init_db()
+    with sqlite3.connect(path) as connection:
+        for n in range(5):
+            connection.execute(
+                "INSERT INTO entries (feed, format, hash, serialized, published_at, discovered_at, created_at)"
+                " VALUES (?, 'rss2', ?, ?, '2024-01-01T00:00:00Z', '2024-01-01T00:00:00Z', '')",
+                (FEED, str(n), f"<item><title>Entry {n}</title></item>")
+            )
+    yield path
+
+
+async def test_recompress_round_trip(database):
+    assert await db.recompress_rows("entries", "zlib", batch_size=2) == 5
+    with sqlite3.connect(database) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM entries WHERE codec IS NULL").fetchone() == (0,)
+    assert await db.recompress_rows("entries", "zlib", batch_size=2) == 0
+
+    await db.connect_db()
+    try:
+        assert await db.recompress_rows("entries", None, batch_size=2) == 5
+        entries = await db.get_mature_entries(FEED, "2099-01-01T00:00:00Z")
+    finally:
+        await db.close_db()
+    assert sorted(e.serialized for e in entries) == [f"<item><title>Entry {n}</title></item>" for n in range(5)]
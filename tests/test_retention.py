@@ -0,0 +1,58 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import db
+from app.services.retention import RetentionJob
+
+FEED = "https://feeds.example.com/rss"
+
+
+@pytest.fixture
+async def database(tmp_path, monkeypatch):
+    path = str(tmp_path / "ltff.db")
+    monkeypatch.setattr(db.settings, "database", path)
+    await db.init_db()
+    yield path
+    await db.close_db()
+
+
+def add_entries(path: str, per_day: int, days: int) -> None:
+    # Entries are discovered as they are published; upstream no longer lists any of them
+    now = datetime.now(timezone.utc)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "INSERT INTO meta (feed, format, hash, serialized, updated_at, created_at)"
+            " VALUES (?, 'rss2', '', '<rss/>', '', '')",
+            (FEED,)
+        )
+        for n in range(per_day * days):
+            at = (now - timedelta(days=n / per_day)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            connection.execute(
+                "INSERT INTO entries (feed, format, hash, serialized, published_at, discovered_at, created_at)"
+                " VALUES (?, 'rss2', ?, '<item/>', ?, ?, ?)",
+                (FEED, str(n), at, at, at)
+            )
+
+
+async def test_busy_feed_keeps_entries_mature_at_the_longest_delay(database):
+    add_entries(database, per_day=100, days=30)
+    await db.connect_db()
+    job = RetentionJob(interval=3600, max_age_days=60, max_entries=1000, keep_entries=200,
+                       max_delay_days=14, batch_size=500)
+    await job.run_once()
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=14)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    assert len(await db.get_mature_entries(FEED, cutoff, limit=200)) == 200
+    # The 1400 entries still maturing and the newest 1000 of the 1600 mature ones are left
+    assert job.deleted == 600
+
+
+async def test_without_delay_the_cap_counts_every_entry(database):
+    add_entries(database, per_day=100, days=20)
+    await db.connect_db()
+    job = RetentionJob(interval=3600, max_age_days=60, max_entries=1000, keep_entries=200,
+                       max_delay_days=0, batch_size=500)
+    await job.run_once()
+    assert job.deleted == 1000
@@ -0,0 +1,33 @@
+import pytest
+
+from app.core import db
+from app.schemas.feed import Entry
+
+FEED = "https://feeds.example.com/rss"
+
+
+@pytest.fixture
+async def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db.settings, "database", str(tmp_path / "ltff.db"))
+    monkeypatch.setattr(db, "_HASH_CHUNK", 3)
+    await db.init_db()
+    await db.connect_db()
+    yield
+    await db.close_db()
+
+
+def entries(count: int, title: str = "Entry") -> list:
+    return [
+        Entry(format="rss2", hash=str(n), serialized=f"<item><title>{title} {n}</title></item>",
+              published_at="2024-01-01T00:00:00Z", discovered_at="2024-01-01T00:00:00Z")
+        for n in range(count)
+    ]
+
+
+async def test_only_changed_entries_are_stored(database):
+    assert await db.upsert_entries(FEED, entries(10)) == 10
+    assert await db.upsert_entries(FEED, entries(10)) == 0
+
+    edited = entries(10)
+    edited[7] = entries(10, title="Edited")[7]
+    assert await db.upsert_entries(FEED, edited + entries(12)[10:]) == 3
@@ -0,0 +1,36 @@
+import aiosqlite
+import pytest
+
+from app.core import db
+
+
+@pytest.fixture
+async def writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(db.settings, "database", str(tmp_path / "ltff.db"))
+    await db.init_db()
+    await db.connect_db()
+    yield
+    await db.close_db()
+
+
+async def count_leases(connection: aiosqlite.Connection) -> int:
+    async with connection.execute("SELECT COUNT(*) FROM fetch_leases") as cursor:
+        (count,) = await cursor.fetchone()
+        return count
+
+
+async def test_failing_rollback_keeps_the_writer_running(writer, monkeypatch):
+    async def fail(connection):
+        raise RuntimeError("op failed")
+
+    async def broken_rollback():
+        raise RuntimeError("rollback failed")
+
+    rollback = db._writer.rollback
+    monkeypatch.setattr(db._writer, "rollback", broken_rollback)
+    with pytest.raises(RuntimeError):
+        await db._write(fail)
+    monkeypatch.setattr(db._writer, "rollback", rollback)
+
+    assert not db._write_task.done()
+    assert await db._write(count_leases) == 0